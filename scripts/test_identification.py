@@ -1,14 +1,35 @@
 #!/usr/bin/env python3
 """Test script to check runway/taxiway identification without running the full agent."""
 
-import base64
+import asyncio
+import os
 import sys
 from pathlib import Path
 
-from anthropic import Anthropic
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
-load_dotenv()
+from airport_graph_agent.images import get_image_source, is_image_url
+
+# Only read .env when the key isn't already set in the environment
+if not os.getenv("ANTHROPIC_API_KEY"):
+    load_dotenv()
+
+_CLIENT: AsyncAnthropic | None = None
+
+
+def _client() -> AsyncAnthropic:
+    """Get or create the client, reused across calls in this process."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = AsyncAnthropic(
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+            )
+        )
+    return _CLIENT
+
 
 IDENTIFICATION_PROMPT = """Analyze this FAA airport diagram and identify the following elements.
 
@@ -36,54 +57,43 @@ IDENTIFICATION_PROMPT = """Analyze this FAA airport diagram and identify the fol
 Be precise and only report what you can clearly see. Do not guess or hallucinate runways."""
 
 
-def test_identification(image_path: str, model: str = "claude-sonnet-4-20250514"):
+async def test_identification(image_path: str, model: str = "claude-sonnet-4-20250514"):
     """Test identification on an airport diagram."""
-    path = Path(image_path)
-    if not path.exists():
+    if not is_image_url(image_path) and not Path(image_path).exists():
         print(f"Error: File not found: {image_path}")
         sys.exit(1)
 
-    # Read and encode image
-    with open(path, "rb") as f:
-        image_data = base64.standard_b64encode(f.read()).decode("utf-8")
-
-    # Determine media type
-    suffix = path.suffix.lower()
-    media_type = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}.get(
-        suffix.lstrip("."), "image/png"
-    )
+    # URL source, or the downscaled and base64-encoded local file
+    source = get_image_source(image_path)
 
     print(f"Testing identification on: {image_path}")
     print(f"Using model: {model}")
     print("-" * 60)
 
-    client = Anthropic()
-
-    response = client.messages.create(
+    async with _client().messages.stream(
         model=model,
         max_tokens=2000,
         messages=[
             {
                 "role": "user",
                 "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": image_data,
-                        },
-                    },
+                    {"type": "image", "source": source},
                     {
                         "type": "text",
                         "text": IDENTIFICATION_PROMPT,
+                        # Image and prompt are static, so cache the whole prefix
+                        "cache_control": {"type": "ephemeral"},
                     },
                 ],
             }
         ],
-    )
+    ) as stream:
+        # Print text as it arrives instead of waiting for the full response
+        async for text in stream.text_stream:
+            print(text, end="", flush=True)
+        response = await stream.get_final_message()
 
-    print(response.content[0].text)
+    print()
     print("-" * 60)
     print(f"Tokens used: {response.usage.input_tokens} input, {response.usage.output_tokens} output")
 
@@ -97,4 +107,4 @@ if __name__ == "__main__":
     image_path = sys.argv[1]
     model = sys.argv[2] if len(sys.argv) > 2 else "claude-sonnet-4-20250514"
 
-    test_identification(image_path, model)
+    asyncio.run(test_identification(image_path, model))
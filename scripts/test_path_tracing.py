@@ -1,35 +1,48 @@
 #!/usr/bin/env python3
 """Test path tracing identification without the full agent."""
 
-import base64
+import asyncio
+import os
 import sys
 from pathlib import Path
 
-from anthropic import Anthropic
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
-load_dotenv()
+from airport_graph_agent.images import get_image_source, is_image_url
 
+# Only read .env when the key isn't already set in the environment
+if not os.getenv("ANTHROPIC_API_KEY"):
+    load_dotenv()
 
-def test_path_tracing(
+_CLIENT: AsyncAnthropic | None = None
+
+
+def _client() -> AsyncAnthropic:
+    """Get or create the client, reused across calls in this process."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = AsyncAnthropic(
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+            )
+        )
+    return _CLIENT
+
+
+async def test_path_tracing(
     image_path: str,
     starting_point: str,
     known_taxiways: list[str],
     model: str = "claude-sonnet-4-20250514"
 ):
     """Test path tracing from a specific point."""
-    path = Path(image_path)
-    if not path.exists():
+    if not is_image_url(image_path) and not Path(image_path).exists():
         print(f"Error: File not found: {image_path}")
         sys.exit(1)
 
-    with open(path, "rb") as f:
-        image_data = base64.standard_b64encode(f.read()).decode("utf-8")
-
-    suffix = path.suffix.lower()
-    media_type = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}.get(
-        suffix.lstrip("."), "image/png"
-    )
+    source = get_image_source(image_path)
 
     known_list = ", ".join(known_taxiways) if known_taxiways else "none yet"
 
@@ -73,9 +86,7 @@ After tracing all paths, provide:
     print(f"Model: {model}")
     print("-" * 60)
 
-    client = Anthropic()
-
-    response = client.messages.create(
+    async with _client().messages.stream(
         model=model,
         max_tokens=3000,
         messages=[
@@ -84,19 +95,21 @@ After tracing all paths, provide:
                 "content": [
                     {
                         "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": image_data,
-                        },
+                        "source": source,
+                        # Cache the image so repeated runs only pay for the prompt
+                        "cache_control": {"type": "ephemeral"},
                     },
                     {"type": "text", "text": prompt},
                 ],
             }
         ],
-    )
+    ) as stream:
+        # Print text as it arrives instead of waiting for the full response
+        async for text in stream.text_stream:
+            print(text, end="", flush=True)
+        response = await stream.get_final_message()
 
-    print(response.content[0].text)
+    print()
     print("-" * 60)
     print(f"Tokens: {response.usage.input_tokens} in, {response.usage.output_tokens} out")
 
@@ -125,4 +138,4 @@ if __name__ == "__main__":
             model = arg
             break
 
-    test_path_tracing(image_path, starting_point, known_taxiways, model)
+    asyncio.run(test_path_tracing(image_path, starting_point, known_taxiways, model))
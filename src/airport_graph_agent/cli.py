@@ -1,8 +1,14 @@
 """Command-line interface for the airport graph agent."""
 
+import logging
+import sys
+from functools import lru_cache
+from logging.handlers import MemoryHandler
+from pathlib import Path
 from typing import Optional
 
 import click
+from dotenv import load_dotenv
 
 from airport_graph_agent.db import (
     clear_database,
@@ -11,27 +17,64 @@ from airport_graph_agent.db import (
     list_airports,
     verify_connection,
 )
+from airport_graph_agent.images import is_image_url
+
+
+@lru_cache(maxsize=1)
+def _agent():
+    """Import the agent module on first use.
+
+    Importing the Claude Agent SDK is slow, so it is deferred until a command
+    actually runs the agent; check, stats and the other commands stay fast.
+    """
+    from airport_graph_agent import agent
+
+    return agent
+
+
+def _validate_diagram(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    """Check that a local diagram path exists; http(s) URLs pass through."""
+    if not is_image_url(value) and not Path(value).is_file():
+        raise click.BadParameter(f"File '{value}' does not exist.")
+    return value
+
+
+def _configure_output() -> None:
+    """Send the package's progress logging to stdout.
+
+    Output is buffered and written in batches rather than once per streamed
+    block; errors flush immediately. This lives in the CLI so importing the
+    library leaves the host application's logging alone.
+    """
+    package_logger = logging.getLogger("airport_graph_agent")
+    for handler in package_logger.handlers[:]:
+        package_logger.removeHandler(handler)
+        handler.close()
+    package_logger.addHandler(
+        MemoryHandler(capacity=64, target=logging.StreamHandler(sys.stdout))
+    )
+    package_logger.setLevel(logging.INFO)
+    package_logger.propagate = False
 
 
 @click.group()
 @click.version_option()
 def main():
     """Airport Graph Agent - Convert FAA airport diagrams to Neo4j graphs."""
-    pass
+    load_dotenv()
+    _configure_output()
 
 
 @main.command()
-@click.argument("diagram", type=click.Path(exists=True))
+@click.argument("diagram", callback=_validate_diagram)
 @click.option("--airport", "-a", required=True, help="ICAO airport code (e.g., KDPA)")
 @click.option("--keep-existing", "-k", is_flag=True, help="Don't clear existing data for this airport")
 @click.option("--quiet", "-q", is_flag=True, help="Suppress verbose output")
 def process(diagram: str, airport: str, keep_existing: bool, quiet: bool):
     """Process an airport diagram and create a graph database.
 
-    DIAGRAM: Path to the PNG airport diagram file.
+    DIAGRAM: Path to the PNG airport diagram file, or an http(s) URL.
     """
-    from airport_graph_agent.agent import run_process_diagram
-
     airport = airport.upper()
 
     if not quiet:
@@ -42,7 +85,7 @@ def process(diagram: str, airport: str, keep_existing: bool, quiet: bool):
         click.echo("")
 
     try:
-        results = run_process_diagram(
+        results = _agent().run_process_diagram(
             image_path=diagram,
             airport=airport,
             clear_existing=not keep_existing,
@@ -76,6 +119,57 @@ def process(diagram: str, airport: str, keep_existing: bool, quiet: bool):
         raise SystemExit(1)
 
 
+@main.command("process-batch")
+@click.argument("diagrams", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--keep-existing", "-k", is_flag=True, help="Don't clear existing data for each airport")
+@click.option("--quiet", "-q", is_flag=True, help="Suppress verbose output")
+@click.option(
+    "--concurrency", "-j", type=click.IntRange(min=1), default=2, show_default=True,
+    help="Diagrams to process at once",
+)
+def process_batch(diagrams: tuple[str, ...], keep_existing: bool, quiet: bool, concurrency: int):
+    """Process several airport diagrams in one run.
+
+    DIAGRAMS: Paths to PNG airport diagrams, each named after its ICAO
+    code (e.g., diagrams/KDPA.png).
+    """
+    items = [(diagram, Path(diagram).stem.upper()) for diagram in diagrams]
+
+    # Two runs on the same airport would clear and overwrite each other's nodes
+    seen: dict[str, str] = {}
+    for diagram, airport in items:
+        if airport in seen:
+            raise click.BadParameter(
+                f"{seen[airport]} and {diagram} both map to airport {airport}",
+                param_hint="DIAGRAMS",
+            )
+        seen[airport] = diagram
+
+    if not quiet:
+        click.echo(f"Processing {len(items)} diagrams ({concurrency} at a time)")
+        click.echo("")
+
+    all_results = _agent().run_process_diagrams(
+        items,
+        clear_existing=not keep_existing,
+        verbose=not quiet,
+        concurrency=concurrency,
+    )
+
+    click.echo("")
+    failed = 0
+    for results in all_results:
+        airport = results["airport"]
+        if results.get("completed"):
+            click.echo(f"✓ {airport}: {results['tool_calls']} tool calls")
+        else:
+            failed += 1
+            click.echo(f"✗ {airport}: {results.get('error', 'Processing incomplete')}")
+
+    if failed:
+        raise SystemExit(1)
+
+
 @main.command()
 def check():
     """Check Neo4j connection and configuration."""
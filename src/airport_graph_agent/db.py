@@ -1,7 +1,12 @@
 """Neo4j database connection and utilities."""
 
+import asyncio
+import atexit
 import os
+import threading
+import time
 from contextlib import contextmanager
+from functools import lru_cache
 from typing import Optional
 
 from dotenv import load_dotenv
@@ -9,72 +14,191 @@ from neo4j import GraphDatabase
 
 from airport_graph_agent.schema import (
     CLEAR_AIRPORT_QUERY,
-    CREATE_CONNECTION_QUERY,
-    CREATE_NODE_QUERIES,
-    FIND_PATH_QUERY,
+    CLEAR_ALL_QUERY,
+    CREATE_CONNECTIONS_BATCH_QUERY,
+    CREATE_NODES_BATCH_QUERIES,
+    DEFAULT_MAX_HOPS,
     GET_ALL_CONNECTIONS_QUERY,
     GET_ALL_NODES_QUERY,
+    GRAPH_STATS_QUERY,
     LIST_AIRPORTS_QUERY,
     SCHEMA_CONSTRAINTS,
+    VALIDATION_FINDINGS_QUERY,
     Connection,
     Node,
     NodeType,
+    find_path_query,
     get_connection_to_dict,
     get_node_to_dict,
 )
 
-load_dotenv()
-
 # Module-level driver instance for reuse
 _driver = None
 
+# Guards driver creation so concurrent first calls share one pool
+_driver_lock = threading.Lock()
+
+# Seconds a get_graph_stats result is reused. The agent's inspection and
+# validation tools often run back-to-back and each asks for the same stats.
+STATS_CACHE_TTL = 5.0
+
+# Graph stats keyed by airport (None for all) -> (monotonic expiry time, stats).
+# Cleared by every write in this module.
+_stats_cache: dict[Optional[str], tuple[float, dict]] = {}
+
+# Bumped by every write, so a read that overlapped a write doesn't cache
+# stats from before it. Guarded by _stats_lock together with _stats_cache.
+_stats_generation = 0
+_stats_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_settings() -> dict:
+    """Read the Neo4j connection settings, loading .env on first use."""
+    load_dotenv()
+    return {
+        "uri": os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        "database": os.getenv("NEO4J_DATABASE", "neo4j"),
+        "auth": (
+            os.getenv("NEO4J_USER", "neo4j"),
+            os.getenv("NEO4J_PASSWORD", "airport-graph-password"),
+        ),
+        "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+        "connection_timeout": float(os.getenv("NEO4J_CONN_TIMEOUT", "30")),
+        "connection_acquisition_timeout": float(os.getenv("NEO4J_ACQ_TIMEOUT", "60")),
+    }
+
 
 def get_driver():
-    """Get or create a Neo4j driver instance from environment variables."""
+    """Get or create a Neo4j driver instance from environment variables.
+
+    The connection pool is sized and timed out from NEO4J_MAX_POOL_SIZE,
+    NEO4J_CONN_TIMEOUT and NEO4J_ACQ_TIMEOUT, and is warmed with a
+    connectivity check when the driver is first created.
+    """
     global _driver
-    if _driver is None:
-        uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-        user = os.getenv("NEO4J_USER", "neo4j")
-        password = os.getenv("NEO4J_PASSWORD", "airport-graph-password")
-        _driver = GraphDatabase.driver(uri, auth=(user, password))
+    if _driver is not None:
+        return _driver
+    with _driver_lock:
+        if _driver is None:
+            settings = _get_settings()
+            driver = GraphDatabase.driver(
+                settings["uri"],
+                auth=settings["auth"],
+                max_connection_pool_size=settings["max_connection_pool_size"],
+                connection_timeout=settings["connection_timeout"],
+                connection_acquisition_timeout=settings["connection_acquisition_timeout"],
+                keep_alive=True,
+            )
+            try:
+                driver.verify_connectivity()
+            except Exception:
+                driver.close()
+                raise
+            _driver = driver
     return _driver
 
 
 def close_driver():
     """Close the driver connection."""
     global _driver
-    if _driver is not None:
-        _driver.close()
-        _driver = None
+    with _driver_lock:
+        if _driver is not None:
+            _driver.close()
+            _driver = None
+
+
+# Close the shared driver's pooled connections cleanly when the process exits
+atexit.register(close_driver)
 
 
 @contextmanager
 def get_session():
-    """Context manager for Neo4j sessions."""
+    """Context manager for Neo4j sessions on the shared driver.
+
+    Sessions name their database explicitly so the driver doesn't have to
+    resolve the user's home database for each one.
+    """
     driver = get_driver()
-    with driver.session() as session:
+    with driver.session(database=_get_settings()["database"]) as session:
         yield session
 
 
+def _fetch_all(tx, query: str, params: dict) -> list[dict]:
+    """Transaction function returning every record of a query as a dict."""
+    return tx.run(query, params).data()
+
+
+def _fetch_values(tx, query: str, params: dict, key: str) -> list:
+    """Transaction function returning one column of a query as a list."""
+    return tx.run(query, params).value(key)
+
+
+def _fetch_one(tx, query: str, params: dict):
+    """Transaction function returning the single record of a query, or None."""
+    return tx.run(query, params).single()
+
+
+def _invalidate_stats_cache() -> None:
+    """Drop cached graph stats after a write."""
+    global _stats_generation
+    with _stats_lock:
+        _stats_generation += 1
+        _stats_cache.clear()
+
+
+def _copy_stats(stats: dict) -> dict:
+    """Copy a stats dict so callers can't modify the cached one."""
+    return {**stats, "nodes_by_type": dict(stats["nodes_by_type"])}
+
+
 def verify_connection() -> bool:
-    """Verify that we can connect to Neo4j."""
+    """Verify that we can connect to Neo4j.
+
+    get_driver checks connectivity when it creates the driver, so this costs
+    no extra round trip; a driver that already exists has connected before.
+    """
     try:
-        driver = get_driver()
-        driver.verify_connectivity()
+        get_driver()
         return True
     except Exception as e:
         print(f"Failed to connect to Neo4j: {e}")
         return False
 
 
+def _parse_schema_statements(script: str) -> dict[str, str]:
+    """Split a schema script into its statements, keyed by constraint/index name."""
+    statements = {}
+    for chunk in script.split(";"):
+        # Drop comment lines so a leading comment doesn't hide its statement
+        statement = "\n".join(
+            line for line in chunk.strip().splitlines() if not line.strip().startswith("//")
+        ).strip()
+        if statement:
+            # CREATE CONSTRAINT|INDEX <name> IF NOT EXISTS ...
+            statements[statement.split()[2]] = statement
+    return statements
+
+
+# Schema statements, parsed once at import
+_SCHEMA_STATEMENTS = _parse_schema_statements(SCHEMA_CONSTRAINTS)
+
+
 def init_schema():
-    """Initialize the database schema with constraints."""
+    """Initialize the database schema with constraints and indexes.
+
+    Existing constraints and indexes are listed first on the same session, so
+    on an already-initialized database this costs two queries instead of
+    one per statement.
+    """
     with get_session() as session:
-        # Execute each constraint separately
-        for line in SCHEMA_CONSTRAINTS.strip().split(";"):
-            line = line.strip()
-            if line and not line.startswith("//"):
-                session.run(line)
+        existing = {record["name"] for record in session.run("SHOW CONSTRAINTS YIELD name")}
+        existing.update(record["name"] for record in session.run("SHOW INDEXES YIELD name"))
+
+        # Execute each missing constraint or index separately
+        for name, statement in _SCHEMA_STATEMENTS.items():
+            if name not in existing:
+                session.run(statement)
 
 
 def clear_database(airport: Optional[str] = None):
@@ -84,26 +208,75 @@ def clear_database(airport: Optional[str] = None):
         airport: If provided, only clear data for this airport.
                  If None, clears all data.
     """
+    # CALL ... IN TRANSACTIONS only works in auto-commit transactions, so this
+    # uses session.run rather than execute_write
     with get_session() as session:
-        session.run(CLEAR_AIRPORT_QUERY, airport=airport)
+        if airport is None:
+            session.run(CLEAR_ALL_QUERY)
+        else:
+            session.run(CLEAR_AIRPORT_QUERY, airport=airport)
+    _invalidate_stats_cache()
 
 
 def create_node(node: Node) -> dict:
     """Create a node in the database."""
-    query = CREATE_NODE_QUERIES[node.node_type]
-    params = get_node_to_dict(node)
+    created = create_nodes_batch([node])
+    return created[0] if created else {}
+
+
+def create_nodes_batch(nodes: list[Node]) -> list[dict]:
+    """Create many nodes in the database.
+
+    Nodes are grouped by type and each group is created with a single
+    UNWIND query, so the number of round-trips is bounded by the number
+    of node types rather than the number of nodes.
+    """
+    rows_by_type: dict[NodeType, list[dict]] = {}
+    for node in nodes:
+        rows_by_type.setdefault(node.node_type, []).append(get_node_to_dict(node))
+    return create_node_rows(rows_by_type)
+
+
+def create_node_rows(rows_by_type: dict[NodeType, list[dict]]) -> list[dict]:
+    """Create nodes from Cypher parameter rows already grouped by type.
+
+    Callers that build the rows themselves skip the Node objects entirely.
+    """
+
+    def work(tx) -> list[dict]:
+        created = []
+        for node_type, rows in rows_by_type.items():
+            result = tx.run(CREATE_NODES_BATCH_QUERIES[node_type], rows=rows)
+            created.extend(dict(record["n"]) for record in result)
+        return created
+
     with get_session() as session:
-        result = session.run(query, params)
-        record = result.single()
-        return dict(record["n"]) if record else {}
+        created = session.execute_write(work)
+    _invalidate_stats_cache()
+    return created
 
 
 def create_connection(connection: Connection) -> bool:
     """Create a connection between two nodes."""
-    params = get_connection_to_dict(connection)
+    return create_connections_batch([connection]) > 0
+
+
+def create_connections_batch(connections: list[Connection]) -> int:
+    """Create many connections in a single write transaction.
+
+    Returns:
+        Number of connections created. Connections whose endpoints don't
+        exist are skipped.
+    """
+    rows = [get_connection_to_dict(conn) for conn in connections]
+
+    def work(tx) -> int:
+        return tx.run(CREATE_CONNECTIONS_BATCH_QUERY, rows=rows).single()["created"]
+
     with get_session() as session:
-        result = session.run(CREATE_CONNECTION_QUERY, params)
-        return result.single() is not None
+        created = session.execute_write(work)
+    _invalidate_stats_cache()
+    return created
 
 
 def get_all_nodes(airport: Optional[str] = None) -> list[dict]:
@@ -113,8 +286,19 @@ def get_all_nodes(airport: Optional[str] = None) -> list[dict]:
         airport: If provided, only return nodes for this airport.
     """
     with get_session() as session:
-        result = session.run(GET_ALL_NODES_QUERY, airport=airport)
-        return [dict(record) for record in result]
+        return session.execute_read(_fetch_all, GET_ALL_NODES_QUERY, {"airport": airport})
+
+
+def group_nodes_by_type(nodes: list[dict]) -> dict[str, list[dict]]:
+    """Group nodes from get_all_nodes by type, keeping their order.
+
+    Nodes are ordered by airport before type, so with several airports a
+    type's nodes are not contiguous; each node is bucketed by its type.
+    """
+    grouped: dict[str, list[dict]] = {}
+    for node in nodes:
+        grouped.setdefault(node["type"], []).append(node)
+    return grouped
 
 
 def get_all_connections(airport: Optional[str] = None) -> list[dict]:
@@ -124,80 +308,106 @@ def get_all_connections(airport: Optional[str] = None) -> list[dict]:
         airport: If provided, only return connections for this airport.
     """
     with get_session() as session:
-        result = session.run(GET_ALL_CONNECTIONS_QUERY, airport=airport)
-        return [dict(record) for record in result]
+        return session.execute_read(
+            _fetch_all, GET_ALL_CONNECTIONS_QUERY, {"airport": airport}
+        )
+
+
+def get_validation_findings(airport: str) -> list[dict]:
+    """Get the nodes of an airport that fail a structural check.
+
+    The checks run server-side, so only failing nodes are transferred
+    rather than the whole graph.
+
+    Returns:
+        One dict per failing node with its id, name, type, degree, whether
+        it touches a runway end, and the ids of connected nodes outside
+        the airport (foreign_ids).
+    """
+    with get_session() as session:
+        return session.execute_read(
+            _fetch_all, VALIDATION_FINDINGS_QUERY, {"airport": airport}
+        )
+
+
+async def read_graph(airport: Optional[str] = None) -> tuple[list[dict], list[dict], dict]:
+    """Read nodes, connections and stats for async callers.
+
+    The three reads run concurrently on worker threads, each on its own
+    pooled session, so their round-trips overlap instead of adding up.
+
+    Returns:
+        Tuple of (nodes, connections, stats)
+    """
+    nodes, connections, stats = await asyncio.gather(
+        asyncio.to_thread(get_all_nodes, airport),
+        asyncio.to_thread(get_all_connections, airport),
+        asyncio.to_thread(get_graph_stats, airport),
+    )
+    return nodes, connections, stats
 
 
-def find_path(airport: str, start_id: str, end_id: str) -> Optional[dict]:
+def find_path(
+    airport: str, start_id: str, end_id: str, max_hops: int = DEFAULT_MAX_HOPS
+) -> Optional[dict]:
     """Find the shortest path between two nodes at an airport.
 
     Args:
         airport: The ICAO airport code.
         start_id: The ID of the starting node.
         end_id: The ID of the ending node.
+        max_hops: Longest path, in connections, to search for.
     """
+    params = {"airport": airport, "start_id": start_id, "end_id": end_id}
     with get_session() as session:
-        result = session.run(
-            FIND_PATH_QUERY,
-            airport=airport,
-            start_id=start_id,
-            end_id=end_id
-        )
-        record = result.single()
-        if record:
-            return {
-                "node_names": record["node_names"],
-                "via_list": record["via_list"],
-                "holds": record["holds"],
-            }
-        return None
+        record = session.execute_read(_fetch_one, find_path_query(max_hops), params)
+    if record:
+        return {
+            "node_names": record["node_names"],
+            "via_list": record["via_list"],
+            "holds": record["holds"],
+        }
+    return None
 
 
 def list_airports() -> list[str]:
     """List all airports in the database."""
     with get_session() as session:
-        result = session.run(LIST_AIRPORTS_QUERY)
-        return [record["airport"] for record in result]
+        return session.execute_read(_fetch_values, LIST_AIRPORTS_QUERY, {}, "airport")
 
 
 def get_graph_stats(airport: Optional[str] = None) -> dict:
     """Get statistics about the current graph.
 
+    Results are reused for STATS_CACHE_TTL seconds, or until the next write
+    through this module.
+
     Args:
         airport: If provided, only count nodes/connections for this airport.
     """
-    with get_session() as session:
-        if airport:
-            node_count = session.run(
-                "MATCH (n) WHERE n.airport = $airport RETURN count(n) AS count",
-                airport=airport
-            ).single()["count"]
-            rel_count = session.run(
-                "MATCH (a)-[r]->(b) WHERE a.airport = $airport RETURN count(r) AS count",
-                airport=airport
-            ).single()["count"]
-        else:
-            node_count = session.run("MATCH (n) RETURN count(n) AS count").single()["count"]
-            rel_count = session.run("MATCH ()-[r]->() RETURN count(r) AS count").single()["count"]
-
-        # Count by type
-        type_counts = {}
-        for node_type in NodeType:
-            label = node_type.value
-            if airport:
-                count = session.run(
-                    f"MATCH (n:{label}) WHERE n.airport = $airport RETURN count(n) AS count",
-                    airport=airport
-                ).single()["count"]
-            else:
-                count = session.run(
-                    f"MATCH (n:{label}) RETURN count(n) AS count"
-                ).single()["count"]
-            if count > 0:
-                type_counts[label] = count
+    with _stats_lock:
+        cached = _stats_cache.get(airport)
+        generation = _stats_generation
+    if cached is not None and cached[0] > time.monotonic():
+        return _copy_stats(cached[1])
 
-        return {
-            "total_nodes": node_count,
-            "total_connections": rel_count,
-            "nodes_by_type": type_counts,
-        }
+    with get_session() as session:
+        record = session.execute_read(_fetch_one, GRAPH_STATS_QUERY, {"airport": airport})
+
+    # Count by type, in NodeType order and skipping empty types
+    label_counts = {row["label"]: row["count"] for row in record["by_label"]}
+    type_counts = {
+        node_type.value: label_counts[node_type.value]
+        for node_type in NodeType
+        if label_counts.get(node_type.value)
+    }
+
+    stats = {
+        "total_nodes": record["total_nodes"],
+        "total_connections": record["total_connections"],
+        "nodes_by_type": type_counts,
+    }
+    with _stats_lock:
+        if generation == _stats_generation:
+            _stats_cache[airport] = (time.monotonic() + STATS_CACHE_TTL, stats)
+    return _copy_stats(stats)
@@ -0,0 +1,253 @@
+"""Image preparation for airport diagram uploads.
+
+FAA diagrams are often multi-megabyte, high-DPI scans. Claude bills vision
+input by resolution, so diagrams are downscaled to a bounded long edge and
+re-encoded as JPEG before being base64-encoded for the API. This keeps
+uploads well under the 5 MB base64 limit and cuts vision tokens per call.
+
+Region-specific calls can crop the diagram first, so only the relevant part
+is uploaded. Diagrams given as http(s) URLs are passed to direct Messages API
+calls as URL image sources, uncropped. MCP tool results can only carry base64
+image data, so for those the URL is downloaded and encoded here.
+
+Pillow is imported on first use, so importing the tools doesn't pay for it
+until a local diagram is actually prepared.
+"""
+
+import mimetypes
+import mmap
+import threading
+from binascii import b2a_base64
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Long-edge pixel budget for uploaded diagrams
+MAX_IMAGE_DIM = 2048
+
+# JPEG quality used when re-encoding diagrams
+JPEG_QUALITY = 85
+
+# Largest raw file sent without re-encoding (5 MB once base64-encoded)
+MAX_PASSTHROUGH_BYTES = 3_750_000
+
+# Media types Claude accepts, keyed by file suffix
+MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+# Crop area as (x0, y0, x1, y1) on the 0-100 diagram scale
+CropBox = tuple[float, float, float, float]
+
+# Crop boxes for named diagram regions. Boxes overlap slightly so taxiways
+# on a boundary appear in both crops.
+REGION_BOXES: dict[str, CropBox] = {
+    "top-left": (0, 0, 55, 55),
+    "top-right": (45, 0, 100, 55),
+    "bottom-left": (0, 45, 55, 100),
+    "bottom-right": (45, 45, 100, 100),
+    "center": (25, 25, 75, 75),
+    "left-edge": (0, 0, 30, 100),
+    "right-edge": (70, 0, 100, 100),
+    "top-edge": (0, 0, 100, 30),
+    "bottom-edge": (0, 70, 100, 100),
+}
+
+# Seconds to wait when downloading a diagram URL for a tool result
+URL_FETCH_TIMEOUT = 30.0
+
+# Most encoded images kept in memory at once (a full diagram plus its crops)
+MAX_CACHED_IMAGES = 16
+
+# Encoded images keyed by (absolute path, crop box) ->
+# ((mtime_ns, size), media type, base64 data), oldest first
+_IMG_CACHE: dict[tuple[str, CropBox | None], tuple[tuple[int, int], str, str]] = {}
+
+# Guards _IMG_CACHE, since images are prepared in worker threads
+_img_cache_lock = threading.Lock()
+
+
+def guess_media_type(path: str | Path) -> str:
+    """Get the media type for an image file from its suffix."""
+    path = Path(path)
+    return (
+        MEDIA_TYPES.get(path.suffix.lower())
+        or mimetypes.guess_type(path.name)[0]
+        or "image/png"
+    )
+
+
+def _fits_budget(path: Path, max_dim: int) -> bool:
+    """Check whether an image can be uploaded as-is without re-encoding."""
+    from PIL import Image
+
+    if path.suffix.lower() not in MEDIA_TYPES or path.stat().st_size > MAX_PASSTHROUGH_BYTES:
+        return False
+    with Image.open(path) as img:
+        return max(img.size) <= max_dim
+
+
+def _reencode(
+    image: Path | BytesIO, max_dim: int, quality: int, crop_box: CropBox | None
+) -> BytesIO:
+    """Crop, downscale and JPEG-encode an image file or buffer into a new buffer."""
+    from PIL import Image
+
+    with Image.open(image) as img:
+        if crop_box is not None:
+            width, height = img.size
+            x0, y0, x1, y1 = crop_box
+            img = img.crop((
+                round(x0 * width / 100),
+                round(y0 * height / 100),
+                round(x1 * width / 100),
+                round(y1 * height / 100),
+            ))
+        img = img.convert("RGB")
+    img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf
+
+
+def b64_file(path: str | Path) -> str:
+    """Base64-encode a file straight from a memory map of it.
+
+    The file is never read into a Python bytes object, so only the encoded
+    output is held in memory.
+    """
+    with open(path, "rb") as f:
+        if Path(path).stat().st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return b2a_base64(mm, newline=False).decode("ascii")
+
+
+def encode_image(
+    path: str | Path,
+    max_dim: int = MAX_IMAGE_DIM,
+    quality: int = JPEG_QUALITY,
+    crop_box: CropBox | None = None,
+) -> tuple[str, str]:
+    """Prepare an image and base64-encode it for a Claude image block.
+
+    Files sent as-is are encoded from a memory map, and re-encoded images
+    straight from the JPEG buffer, so no extra raw copy is held in memory.
+
+    Returns:
+        Tuple of (base64 data, media type)
+    """
+    path = Path(path)
+    if crop_box is None and _fits_budget(path, max_dim):
+        return b64_file(path), guess_media_type(path)
+
+    buf = _reencode(path, max_dim, quality, crop_box)
+    return b2a_base64(buf.getbuffer(), newline=False).decode("ascii"), "image/jpeg"
+
+
+def get_encoded_image(
+    path: str | Path, crop_box: CropBox | None = None
+) -> tuple[str, str]:
+    """Get the encoded image for a path, reusing earlier work when possible.
+
+    The agent loads the same diagram from several tools during one run, so
+    the encoded payload is cached per file and crop box and only rebuilt
+    when the file's modification time or size changes. The least recently
+    used entries are evicted past MAX_CACHED_IMAGES.
+
+    Returns:
+        Tuple of (base64 data, media type)
+    """
+    resolved = str(Path(path).resolve())
+    key = (resolved, crop_box)
+    st = Path(resolved).stat()
+    version = (st.st_mtime_ns, st.st_size)
+
+    with _img_cache_lock:
+        cached = _IMG_CACHE.pop(key, None)
+        if cached is not None and cached[0] == version:
+            _IMG_CACHE[key] = cached
+            return cached[2], cached[1]
+
+    image_data, media_type = encode_image(resolved, crop_box=crop_box)
+    with _img_cache_lock:
+        _IMG_CACHE[key] = (version, media_type, image_data)
+        while len(_IMG_CACHE) > MAX_CACHED_IMAGES:
+            del _IMG_CACHE[next(iter(_IMG_CACHE))]
+    return image_data, media_type
+
+
+def _encode_bytes(
+    data: bytes, media_type: str, max_dim: int = MAX_IMAGE_DIM, quality: int = JPEG_QUALITY
+) -> tuple[str, str]:
+    """Downscale and base64-encode an image held in memory.
+
+    Returns:
+        Tuple of (base64 data, media type)
+    """
+    from PIL import Image
+
+    if media_type in MEDIA_TYPES.values() and len(data) <= MAX_PASSTHROUGH_BYTES:
+        with Image.open(BytesIO(data)) as img:
+            if max(img.size) <= max_dim:
+                return b2a_base64(data, newline=False).decode("ascii"), media_type
+
+    buf = _reencode(BytesIO(data), max_dim, quality, None)
+    return b2a_base64(buf.getbuffer(), newline=False).decode("ascii"), "image/jpeg"
+
+
+@lru_cache(maxsize=4)
+def _get_url_image(url: str) -> tuple[str, str]:
+    """Download and encode a diagram URL, caching the last few per URL.
+
+    Returns:
+        Tuple of (base64 data, media type)
+    """
+    import httpx
+
+    response = httpx.get(url, follow_redirects=True, timeout=URL_FETCH_TIMEOUT)
+    response.raise_for_status()
+    media_type = (
+        response.headers.get("content-type", "").split(";")[0].strip()
+        or guess_media_type(urlparse(url).path)
+    )
+    return _encode_bytes(response.content, media_type)
+
+
+def is_image_url(image_path: str) -> bool:
+    """Check whether a diagram location is a remote URL rather than a file."""
+    return image_path.startswith(("http://", "https://"))
+
+
+def get_image_source(image_path: str, crop_box: CropBox | None = None) -> dict[str, str]:
+    """Build the source for a Claude image block.
+
+    URLs are sent as URL sources for Claude to fetch directly, uncropped;
+    local files are cropped to crop_box if given, downscaled and
+    base64-encoded.
+    """
+    if is_image_url(image_path):
+        return {"type": "url", "url": image_path}
+
+    image_data, media_type = get_encoded_image(image_path, crop_box)
+    return {"type": "base64", "media_type": media_type, "data": image_data}
+
+
+def get_image_content(image_path: str) -> dict[str, str]:
+    """Build an image block for an MCP tool result.
+
+    Tool results reach Claude as MCP image content, which only carries
+    base64 data and a mimeType, so URL diagrams are downloaded and encoded
+    here rather than passed as URL sources.
+    """
+    if is_image_url(image_path):
+        image_data, media_type = _get_url_image(image_path)
+    else:
+        image_data, media_type = get_encoded_image(image_path)
+    return {"type": "image", "data": image_data, "mimeType": media_type}
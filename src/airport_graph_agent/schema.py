@@ -25,6 +25,7 @@ Relationships have:
 
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 
@@ -50,7 +51,7 @@ class Direction(Enum):
     NW = "NW"
 
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     """Base class for all airport graph nodes."""
     id: str
@@ -61,9 +62,10 @@ class Node:
     y: float  # Relative position 0-100
 
 
-@dataclass
 class RunwayEnd(Node):
     """A runway threshold/end point."""
+    __slots__ = ("heading", "runway_id")
+
     heading: int  # Magnetic heading (e.g., 270 for runway 27)
     runway_id: str  # Groups both ends (e.g., "9_27" for 09/27)
 
@@ -74,9 +76,10 @@ class RunwayEnd(Node):
         self.runway_id = runway_id
 
 
-@dataclass
 class TaxiwayIntersection(Node):
     """An intersection or waypoint on taxiways."""
+    __slots__ = ("taxiways",)
+
     taxiways: list[str]  # List of taxiway names at this point
 
     def __init__(self, id: str, airport: str, name: str, x: float, y: float,
@@ -85,9 +88,10 @@ class TaxiwayIntersection(Node):
         self.taxiways = taxiways
 
 
-@dataclass
 class HoldShort(Node):
     """A hold short position before a runway."""
+    __slots__ = ("runway", "taxiway")
+
     runway: str  # Which runway to hold short of
     taxiway: str  # Which taxiway this hold short is on
 
@@ -98,28 +102,31 @@ class HoldShort(Node):
         self.taxiway = taxiway
 
 
-@dataclass
 class FBO(Node):
     """A Fixed Base Operator location."""
+    __slots__ = ()
+
     def __init__(self, id: str, airport: str, name: str, x: float, y: float):
         super().__init__(id, airport, name, NodeType.FBO, x, y)
 
 
-@dataclass
 class Terminal(Node):
     """A terminal building."""
+    __slots__ = ()
+
     def __init__(self, id: str, airport: str, name: str, x: float, y: float):
         super().__init__(id, airport, name, NodeType.TERMINAL, x, y)
 
 
-@dataclass
 class Ramp(Node):
     """A parking/ramp area."""
+    __slots__ = ()
+
     def __init__(self, id: str, airport: str, name: str, x: float, y: float):
         super().__init__(id, airport, name, NodeType.RAMP, x, y)
 
 
-@dataclass
+@dataclass(slots=True)
 class Connection:
     """A connection between two nodes."""
     from_id: str
@@ -151,75 +158,145 @@ FOR (n:Terminal) REQUIRE n.id IS UNIQUE;
 
 CREATE CONSTRAINT ramp_id IF NOT EXISTS
 FOR (n:Ramp) REQUIRE n.id IS UNIQUE;
+
+// Indexes on the airport property used by per-airport filters
+CREATE INDEX runway_end_airport IF NOT EXISTS
+FOR (n:RunwayEnd) ON (n.airport);
+
+CREATE INDEX taxiway_intersection_airport IF NOT EXISTS
+FOR (n:TaxiwayIntersection) ON (n.airport);
+
+CREATE INDEX hold_short_airport IF NOT EXISTS
+FOR (n:HoldShort) ON (n.airport);
+
+CREATE INDEX fbo_airport IF NOT EXISTS
+FOR (n:FBO) ON (n.airport);
+
+CREATE INDEX terminal_airport IF NOT EXISTS
+FOR (n:Terminal) ON (n.airport);
+
+CREATE INDEX ramp_airport IF NOT EXISTS
+FOR (n:Ramp) ON (n.airport);
 """
 
-CREATE_NODE_QUERIES = {
+# Node creation queries, one per label. Each takes a list of node property
+# dicts as $rows so any number of nodes is created in a single round-trip.
+CREATE_NODES_BATCH_QUERIES = {
     NodeType.RUNWAY_END: """
+        UNWIND $rows AS r
         CREATE (n:RunwayEnd {
-            id: $id, airport: $airport, name: $name, x: $x, y: $y,
-            heading: $heading, runway_id: $runway_id
+            id: r.id, airport: r.airport, name: r.name, x: r.x, y: r.y,
+            heading: r.heading, runway_id: r.runway_id
         })
         RETURN n
     """,
     NodeType.TAXIWAY_INTERSECTION: """
+        UNWIND $rows AS r
         CREATE (n:TaxiwayIntersection {
-            id: $id, airport: $airport, name: $name, x: $x, y: $y,
-            taxiways: $taxiways
+            id: r.id, airport: r.airport, name: r.name, x: r.x, y: r.y,
+            taxiways: r.taxiways
         })
         RETURN n
     """,
     NodeType.HOLD_SHORT: """
+        UNWIND $rows AS r
         CREATE (n:HoldShort {
-            id: $id, airport: $airport, name: $name, x: $x, y: $y,
-            runway: $runway, taxiway: $taxiway
+            id: r.id, airport: r.airport, name: r.name, x: r.x, y: r.y,
+            runway: r.runway, taxiway: r.taxiway
         })
         RETURN n
     """,
     NodeType.FBO: """
-        CREATE (n:FBO {id: $id, airport: $airport, name: $name, x: $x, y: $y})
+        UNWIND $rows AS r
+        CREATE (n:FBO {id: r.id, airport: r.airport, name: r.name, x: r.x, y: r.y})
         RETURN n
     """,
     NodeType.TERMINAL: """
-        CREATE (n:Terminal {id: $id, airport: $airport, name: $name, x: $x, y: $y})
+        UNWIND $rows AS r
+        CREATE (n:Terminal {id: r.id, airport: r.airport, name: r.name, x: r.x, y: r.y})
         RETURN n
     """,
     NodeType.RAMP: """
-        CREATE (n:Ramp {id: $id, airport: $airport, name: $name, x: $x, y: $y})
+        UNWIND $rows AS r
+        CREATE (n:Ramp {id: r.id, airport: r.airport, name: r.name, x: r.x, y: r.y})
         RETURN n
     """,
 }
 
-CREATE_CONNECTION_QUERY = """
-    MATCH (a), (b)
-    WHERE a.id = $from_id AND b.id = $to_id
-    CREATE (a)-[r:CONNECTS {
-        via: $via,
-        distance: $distance,
-        direction: $direction,
-        requires_hold: $requires_hold
-    }]->(b)
-    RETURN r
+
+def _match_node_by_id(var: str, id_expr: str, scope: Optional[str] = None) -> str:
+    """Build a subquery that finds a node of any airport label by id.
+
+    Each UNION branch is label-scoped, so the lookup is an index seek on that
+    label's unique id constraint rather than a scan of every node. If given,
+    scope is the outer variable imported into each branch.
+    """
+    importing = f"        WITH {scope}\n" if scope else ""
+    branches = "\n        UNION\n".join(
+        f"{importing}        MATCH ({var}:{node_type.value} {{id: {id_expr}}})\n        RETURN {var}"
+        for node_type in NodeType
+    )
+    return f"CALL {{\n{branches}\n    }}"
+
+
+def _union_by_label(where: str, returns: str, union: str = "UNION ALL") -> str:
+    """Build a CALL subquery that matches n once per airport node label.
+
+    Each branch scans only its own label instead of every node in the
+    database. {label} in returns is replaced with the branch's label.
+    """
+    branches = f"\n        {union}\n".join(
+        f"        MATCH (n:{node_type.value})\n"
+        + (f"        WHERE {where}\n" if where else "")
+        + f"        RETURN {returns.replace('{label}', node_type.value)}"
+        for node_type in NodeType
+    )
+    return f"CALL {{\n{branches}\n    }}"
+
+
+# Create connections from a list of connection property dicts ($rows).
+# Rows whose endpoints don't exist are skipped.
+CREATE_CONNECTIONS_BATCH_QUERY = f"""
+    UNWIND $rows AS row
+    {_match_node_by_id("a", "row.from_id", "row")}
+    {_match_node_by_id("b", "row.to_id", "row")}
+    CREATE (a)-[r:CONNECTS {{
+        via: row.via,
+        distance: row.distance,
+        direction: row.direction,
+        requires_hold: row.requires_hold
+    }}]->(b)
+    RETURN count(r) AS created
 """
 
-# Query to find path between two nodes at a specific airport
-FIND_PATH_QUERY = """
-    MATCH path = shortestPath((start)-[:CONNECTS*]-(end))
-    WHERE start.id = $start_id AND end.id = $end_id
-          AND start.airport = $airport AND end.airport = $airport
-    RETURN path,
-           [node IN nodes(path) | node.name] AS node_names,
+# Default cap on the number of hops in a path search
+DEFAULT_MAX_HOPS = 50
+
+
+@lru_cache(maxsize=None)
+def find_path_query(max_hops: int = DEFAULT_MAX_HOPS) -> str:
+    """Build the query to find a path between two nodes at a specific airport.
+
+    Both endpoints are found by index seek before the search starts, and the
+    search is capped at max_hops. Cypher doesn't accept parameters as
+    variable-length bounds, so the cap is rendered into the query text.
+    """
+    return f"""
+    {_match_node_by_id("start", "$start_id")}
+    {_match_node_by_id("end", "$end_id")}
+    WITH start, end
+    WHERE start.airport = $airport AND end.airport = $airport
+    MATCH path = shortestPath((start)-[:CONNECTS*1..{int(max_hops)}]-(end))
+    RETURN [node IN nodes(path) | node.name] AS node_names,
            [rel IN relationships(path) | rel.via] AS via_list,
            [rel IN relationships(path) | rel.requires_hold] AS holds
 """
 
 # Query to get all nodes (optionally filtered by airport)
-GET_ALL_NODES_QUERY = """
-    MATCH (n)
-    WHERE (n:RunwayEnd OR n:TaxiwayIntersection OR n:HoldShort
-          OR n:FBO OR n:Terminal OR n:Ramp)
-          AND ($airport IS NULL OR n.airport = $airport)
+GET_ALL_NODES_QUERY = f"""
+    {_union_by_label("$airport IS NULL OR n.airport = $airport", "n, '{label}' AS type")}
     RETURN n.id AS id, n.airport AS airport, n.name AS name,
-           labels(n)[0] AS type, n.x AS x, n.y AS y
+           type, n.x AS x, n.y AS y
     ORDER BY airport, type, name
 """
 
@@ -232,23 +309,70 @@ GET_ALL_CONNECTIONS_QUERY = """
            r.direction AS direction, r.requires_hold AS requires_hold
 """
 
-# Query to clear an airport's data (or all if airport is NULL)
-CLEAR_AIRPORT_QUERY = """
+# Nodes deleted per inner transaction when clearing data
+CLEAR_BATCH_SIZE = 10000
+
+# Query to clear an airport's data. Deletes are committed in batches so the
+# transaction state stays bounded; must be run as an auto-commit query.
+CLEAR_AIRPORT_QUERY = f"""
+    {_union_by_label("n.airport = $airport", "n")}
+    CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {CLEAR_BATCH_SIZE} ROWS
+"""
+
+# Query to clear all data, batched the same way
+CLEAR_ALL_QUERY = f"""
     MATCH (n)
-    WHERE $airport IS NULL OR n.airport = $airport
-    DETACH DELETE n
+    CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {CLEAR_BATCH_SIZE} ROWS
+"""
+
+# Query to find an airport's nodes that fail a structural check: no
+# connections, hold shorts not connected to a runway end, taxiway
+# intersections with fewer than 2 connections, or connections leading to
+# nodes outside the airport. Only the failing nodes are returned.
+VALIDATION_FINDINGS_QUERY = f"""
+    {_union_by_label("n.airport = $airport", "n, '{label}' AS type")}
+    WITH n, type,
+         COUNT {{ (n)-[:CONNECTS]-() }} AS degree,
+         EXISTS {{ (n)-[:CONNECTS]-(:RunwayEnd) }} AS touches_runway,
+         [(n)-[:CONNECTS]->(m) WHERE m.airport IS NULL OR m.airport <> $airport | m.id]
+             AS foreign_ids
+    WHERE degree = 0
+          OR (type = 'HoldShort' AND NOT touches_runway)
+          OR (type = 'TaxiwayIntersection' AND degree < 2)
+          OR size(foreign_ids) > 0
+    RETURN n.id AS id, n.name AS name, type, degree, touches_runway, foreign_ids
+    ORDER BY type, name
+"""
+
+# Query to get node/connection totals and per-label node counts in one
+# round-trip (optionally filtered by airport)
+GRAPH_STATS_QUERY = f"""
+    {_union_by_label(
+        "$airport IS NULL OR n.airport = $airport",
+        "'{label}' AS label, count(n) AS count,"
+        " sum(COUNT { (n)-[:CONNECTS]->() }) AS connections",
+    )}
+    RETURN sum(count) AS total_nodes,
+           sum(connections) AS total_connections,
+           collect({{label: label, count: count}}) AS by_label
 """
 
 # Query to list all airports in the database
-LIST_AIRPORTS_QUERY = """
-    MATCH (n)
-    WHERE n:RunwayEnd OR n:TaxiwayIntersection OR n:HoldShort
-          OR n:FBO OR n:Terminal OR n:Ramp
-    RETURN DISTINCT n.airport AS airport
+LIST_AIRPORTS_QUERY = f"""
+    {_union_by_label("", "DISTINCT n.airport AS airport", union="UNION")}
+    RETURN airport
     ORDER BY airport
 """
 
 
+# Type-specific properties stored on each node subclass
+_EXTRA_FIELDS: dict[type, tuple[str, ...]] = {
+    RunwayEnd: ("heading", "runway_id"),
+    TaxiwayIntersection: ("taxiways",),
+    HoldShort: ("runway", "taxiway"),
+}
+
+
 def get_node_to_dict(node: Node) -> dict:
     """Convert a Node object to a dictionary for Cypher parameters."""
     base = {
@@ -258,16 +382,8 @@ def get_node_to_dict(node: Node) -> dict:
         "x": node.x,
         "y": node.y,
     }
-
-    if isinstance(node, RunwayEnd):
-        base["heading"] = node.heading
-        base["runway_id"] = node.runway_id
-    elif isinstance(node, TaxiwayIntersection):
-        base["taxiways"] = node.taxiways
-    elif isinstance(node, HoldShort):
-        base["runway"] = node.runway
-        base["taxiway"] = node.taxiway
-
+    for field in _EXTRA_FIELDS.get(type(node), ()):
+        base[field] = getattr(node, field)
     return base
 
 
@@ -4,36 +4,31 @@ These tools help the agent systematically analyze airport diagrams
 and track what elements have been identified.
 """
 
-import base64
+import asyncio
 from pathlib import Path
 from typing import Any
 
-from anthropic import Anthropic
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from claude_agent_sdk import tool
 
+from airport_graph_agent.images import (
+    MEDIA_TYPES,
+    REGION_BOXES,
+    CropBox,
+    get_image_content,
+    get_image_source,
+    is_image_url,
+)
+
 # Use Opus for verification tasks (more accurate)
 VERIFICATION_MODEL = "claude-opus-4-20250514"
 
+# Maximum concurrent Opus requests when tracing from several points
+MAX_CONCURRENT_TRACES = 4
 
-@tool(
-    "get_analysis_guidance",
-    "Get guidance on what elements to look for in an FAA airport diagram. Call this first to understand what to extract.",
-    {
-        "type": "object",
-        "properties": {
-            "airport": {
-                "type": "string",
-                "description": "ICAO airport code (e.g., KDPA)"
-            }
-        },
-        "required": ["airport"]
-    }
-)
-async def get_analysis_guidance(args: dict[str, Any]) -> dict[str, Any]:
-    """Provide guidance on analyzing an airport diagram."""
-    airport = args["airport"]
-
-    guidance = f"""Analyzing airport diagram for {airport}. Look for these elements:
+# Guidance returned by get_analysis_guidance; only the airport code varies
+ANALYSIS_GUIDANCE = """Analyzing airport diagram for {airport}. Look for these elements:
 
 ## 1. RUNWAYS (identify first)
 - Find all runway numbers (e.g., 27L/09R, 36/18)
@@ -82,6 +77,125 @@ async def get_analysis_guidance(args: dict[str, Any]) -> dict[str, Any]:
 
 Start by identifying all runways, then taxiways, then connections."""
 
+# Module-level client so every tool call shares one HTTP connection pool
+_client = None
+
+
+def get_client() -> AsyncAnthropic:
+    """Get or create the shared async Anthropic client."""
+    global _client
+    if _client is None:
+        _client = AsyncAnthropic(
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+            )
+        )
+    return _client
+
+
+def _parse_crop_box(value: Any) -> CropBox:
+    """Validate a crop_box argument as [x0, y0, x1, y1] on the 0-100 scale.
+
+    Raises:
+        ValueError: If the box is malformed, out of range or empty
+    """
+    if not isinstance(value, (list, tuple)) or len(value) != 4:
+        raise ValueError("crop_box must be a list of four numbers [x0, y0, x1, y1]")
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+        raise ValueError("crop_box values must be numbers")
+    x0, y0, x1, y1 = value
+    if not all(0 <= v <= 100 for v in value):
+        raise ValueError("crop_box values must be between 0 and 100")
+    if x0 >= x1 or y0 >= y1:
+        raise ValueError("crop_box must have x0 < x1 and y0 < y1")
+    return (x0, y0, x1, y1)
+
+
+def _build_tracing_prompt(
+    starting_point: str, known_taxiways: list[str], crop_box: CropBox | None = None
+) -> str:
+    """Build the path tracing prompt for a single starting point."""
+    known_list = ", ".join(known_taxiways) if known_taxiways else "none yet"
+    if crop_box:
+        x0, y0, x1, y1 = crop_box
+        crop_note = (
+            f"Image: cropped to the region x {x0:g}-{x1:g}, y {y0:g}-{y1:g} of the full "
+            "diagram (0-100 scale), so give any positions relative to the full diagram\n"
+        )
+    else:
+        crop_note = ""
+
+    return f"""## Path Tracing Task
+
+Starting from: **{starting_point}**
+Already known taxiways: {known_list}
+{crop_note}
+### Instructions:
+1. Locate {starting_point} on the diagram
+2. Find ALL grey taxiway paths that connect to or lead away from this point
+3. For EACH grey path, trace it and note:
+   - The taxiway letter/name (look for labels on or near the grey path)
+   - Where it leads (another taxiway intersection, runway, ramp, etc.)
+   - Any OTHER taxiways it intersects along the way
+
+4. Pay special attention to:
+   - Small connector taxiways that might be easy to miss
+   - Taxiways at the edges/corners of the diagram
+   - Any taxiway letters NOT in the known list above
+
+### Report Format:
+For each path traced, report:
+```
+PATH: [Taxiway Letter]
+  From: {starting_point}
+  Direction: [N/S/E/W/etc]
+  Passes through: [intersections]
+  Ends at: [destination]
+  NEW taxiway? [Yes if not in known list]
+```
+
+### Summary (REQUIRED):
+At the end, provide:
+1. **ALL taxiways found from {starting_point}**: [list]
+2. **NEW taxiways discovered** (not in known list): [list or "none"]
+3. **Suggested next starting point**: [suggestion]"""
+
+
+def _image_messages(
+    source: dict[str, str], prompt: str, cache: bool = False
+) -> list[dict[str, Any]]:
+    """Build a single-turn message list with the diagram and a text prompt.
+
+    Set cache only when the same image will be sent again shortly, such as
+    the full diagram across several traces; a cache write costs more than
+    plain input, so one-off crops are left uncached.
+    """
+    image: dict[str, Any] = {"type": "image", "source": source}
+    if cache:
+        image["cache_control"] = {"type": "ephemeral"}
+    return [{"role": "user", "content": [image, {"type": "text", "text": prompt}]}]
+
+
+@tool(
+    "get_analysis_guidance",
+    "Get guidance on what elements to look for in an FAA airport diagram. Call this first to understand what to extract.",
+    {
+        "type": "object",
+        "properties": {
+            "airport": {
+                "type": "string",
+                "description": "ICAO airport code (e.g., KDPA)"
+            }
+        },
+        "required": ["airport"]
+    }
+)
+async def get_analysis_guidance(args: dict[str, Any]) -> dict[str, Any]:
+    """Provide guidance on analyzing an airport diagram."""
+    airport = args["airport"]
+
+    guidance = ANALYSIS_GUIDANCE.format(airport=airport)
+
     return {
         "content": [{"type": "text", "text": guidance}]
     }
@@ -95,7 +209,7 @@ Start by identifying all runways, then taxiways, then connections."""
         "properties": {
             "image_path": {
                 "type": "string",
-                "description": "Path to the PNG airport diagram file"
+                "description": "Path to the PNG airport diagram file, or an http(s) URL"
             }
         },
         "required": ["image_path"]
@@ -107,42 +221,27 @@ async def load_diagram_image(args: dict[str, Any]) -> dict[str, Any]:
 
     try:
         path = Path(image_path)
-        if not path.exists():
+        is_url = is_image_url(image_path)
+        if not is_url and not path.exists():
             return {
                 "content": [{"type": "text", "text": f"Error: Image file not found: {image_path}"}],
                 "is_error": True
             }
 
-        # Determine media type
+        # Check the image format is supported
         suffix = path.suffix.lower()
-        if suffix == ".png":
-            media_type = "image/png"
-        elif suffix in [".jpg", ".jpeg"]:
-            media_type = "image/jpeg"
-        elif suffix == ".gif":
-            media_type = "image/gif"
-        elif suffix == ".webp":
-            media_type = "image/webp"
-        else:
+        if not is_url and suffix not in MEDIA_TYPES:
             return {
                 "content": [{"type": "text", "text": f"Error: Unsupported image format: {suffix}"}],
                 "is_error": True
             }
 
-        # Read and encode the image
-        with open(path, "rb") as f:
-            image_data = base64.standard_b64encode(f.read()).decode("utf-8")
+        # Get the image content off the event loop (encoding is cached across tool calls)
+        image = await asyncio.to_thread(get_image_content, image_path)
 
         return {
             "content": [
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": media_type,
-                        "data": image_data,
-                    }
-                },
+                image,
                 {
                     "type": "text",
                     "text": f"Airport diagram loaded from {image_path}. Analyze this image to identify airport elements."
@@ -249,7 +348,7 @@ async def report_analysis_progress(args: dict[str, Any]) -> dict[str, Any]:
         "properties": {
             "image_path": {
                 "type": "string",
-                "description": "Path to the PNG airport diagram file"
+                "description": "Path to the PNG airport diagram file, or an http(s) URL"
             },
             "starting_point": {
                 "type": "string",
@@ -259,6 +358,13 @@ async def report_analysis_progress(args: dict[str, Any]) -> dict[str, Any]:
                 "type": "array",
                 "items": {"type": "string"},
                 "description": "List of taxiways already identified (e.g., ['A', 'B', 'C', 'W'])"
+            },
+            "crop_box": {
+                "type": "array",
+                "items": {"type": "number", "minimum": 0, "maximum": 100},
+                "minItems": 4,
+                "maxItems": 4,
+                "description": "Optional area around the starting point to upload, as [x0, y0, x1, y1] on the 0-100 diagram scale"
             }
         },
         "required": ["image_path", "starting_point", "known_taxiways"]
@@ -271,80 +377,35 @@ async def trace_paths_from_point(args: dict[str, Any]) -> dict[str, Any]:
     known_taxiways = args.get("known_taxiways", [])
 
     try:
-        path = Path(image_path)
-        if not path.exists():
+        crop_box = _parse_crop_box(args["crop_box"]) if args.get("crop_box") else None
+    except ValueError as e:
+        return {
+            "content": [{"type": "text", "text": f"Error: {e}"}],
+            "is_error": True
+        }
+
+    try:
+        if not is_image_url(image_path) and not Path(image_path).exists():
             return {
                 "content": [{"type": "text", "text": f"Error: Image file not found: {image_path}"}],
                 "is_error": True
             }
 
-        # Read and encode the image
-        suffix = path.suffix.lower()
-        media_type = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}.get(
-            suffix, "image/png"
-        )
-
-        with open(path, "rb") as f:
-            image_data = base64.standard_b64encode(f.read()).decode("utf-8")
-
-        known_list = ", ".join(known_taxiways) if known_taxiways else "none yet"
-
-        tracing_prompt = f"""## Path Tracing Task
-
-Starting from: **{starting_point}**
-Already known taxiways: {known_list}
-
-### Instructions:
-1. Locate {starting_point} on the diagram
-2. Find ALL grey taxiway paths that connect to or lead away from this point
-3. For EACH grey path, trace it and note:
-   - The taxiway letter/name (look for labels on or near the grey path)
-   - Where it leads (another taxiway intersection, runway, ramp, etc.)
-   - Any OTHER taxiways it intersects along the way
-
-4. Pay special attention to:
-   - Small connector taxiways that might be easy to miss
-   - Taxiways at the edges/corners of the diagram
-   - Any taxiway letters NOT in the known list above
-
-### Report Format:
-For each path traced, report:
-```
-PATH: [Taxiway Letter]
-  From: {starting_point}
-  Direction: [N/S/E/W/etc]
-  Passes through: [intersections]
-  Ends at: [destination]
-  NEW taxiway? [Yes if not in known list]
-```
-
-### Summary (REQUIRED):
-At the end, provide:
-1. **ALL taxiways found from {starting_point}**: [list]
-2. **NEW taxiways discovered** (not in known list): [list or "none"]
-3. **Suggested next starting point**: [suggestion]"""
+        # Upload only the area around the starting point if one was given
+        # (URLs are sent uncropped)
+        source = await asyncio.to_thread(get_image_source, image_path, crop_box)
+        if is_image_url(image_path):
+            crop_box = None
 
         # Call Opus for high-accuracy path tracing
-        client = Anthropic()
-        response = client.messages.create(
+        response = await get_client().messages.create(
             model=VERIFICATION_MODEL,
             max_tokens=3000,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": image_data,
-                            },
-                        },
-                        {"type": "text", "text": tracing_prompt},
-                    ],
-                }
-            ],
+            messages=_image_messages(
+                source,
+                _build_tracing_prompt(starting_point, known_taxiways, crop_box),
+                cache=crop_box is None,
+            ),
         )
 
         result_text = response.content[0].text
@@ -361,6 +422,99 @@ At the end, provide:
         }
 
 
+@tool(
+    "trace_paths_from_points",
+    "Trace taxiway paths from several starting points at once. Runs the Opus path tracing for every point in parallel, so prefer this over repeated trace_paths_from_point calls.",
+    {
+        "type": "object",
+        "properties": {
+            "image_path": {
+                "type": "string",
+                "description": "Path to the PNG airport diagram file, or an http(s) URL"
+            },
+            "starting_points": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Names of the starting points (e.g., ['Runway 10', 'Runway 28', 'Main Ramp'])"
+            },
+            "known_taxiways": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "List of taxiways already identified (e.g., ['A', 'B', 'C', 'W'])"
+            }
+        },
+        "required": ["image_path", "starting_points", "known_taxiways"]
+    }
+)
+async def trace_paths_from_points(args: dict[str, Any]) -> dict[str, Any]:
+    """Call Opus concurrently to trace paths from several starting points."""
+    image_path = args["image_path"]
+    starting_points = args["starting_points"]
+    known_taxiways = args.get("known_taxiways", [])
+
+    try:
+        if not starting_points:
+            return {
+                "content": [{"type": "text", "text": "Error: No starting points given"}],
+                "is_error": True
+            }
+        if not is_image_url(image_path) and not Path(image_path).exists():
+            return {
+                "content": [{"type": "text", "text": f"Error: Image file not found: {image_path}"}],
+                "is_error": True
+            }
+
+        # Get the image source off the event loop (encoding is cached across tool calls)
+        source = await asyncio.to_thread(get_image_source, image_path)
+
+        client = get_client()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRACES)
+        cache_written = asyncio.Event()
+
+        async def trace(starting_point: str) -> str:
+            try:
+                async with semaphore, client.messages.stream(
+                    model=VERIFICATION_MODEL,
+                    max_tokens=3000,
+                    messages=_image_messages(
+                        source, _build_tracing_prompt(starting_point, known_taxiways), cache=True
+                    ),
+                ) as stream:
+                    # The first event arrives once the prompt, image included,
+                    # has been processed and written to the cache
+                    async for _ in stream:
+                        cache_written.set()
+                    message = await stream.get_final_message()
+            finally:
+                cache_written.set()
+            return message.content[0].text
+
+        # Start the first trace and launch the rest as soon as its stream
+        # begins, so they read the cached image instead of each writing it
+        first, *rest = starting_points
+        first_trace = asyncio.create_task(trace(first))
+        await cache_written.wait()
+        results = await asyncio.gather(
+            first_trace, *(trace(point) for point in rest), return_exceptions=True
+        )
+
+        sections = []
+        for starting_point, result in zip(starting_points, results):
+            if isinstance(result, Exception):
+                sections.append(f"[Path Tracing from {starting_point} failed: {result}]")
+            else:
+                sections.append(f"[Path Tracing via Opus from {starting_point}]\n\n{result}")
+
+        return {
+            "content": [{"type": "text", "text": "\n\n---\n\n".join(sections)}]
+        }
+    except Exception as e:
+        return {
+            "content": [{"type": "text", "text": f"Error during path tracing: {str(e)}"}],
+            "is_error": True
+        }
+
+
 @tool(
     "scan_diagram_region",
     "Scan a specific region of the diagram for taxiways. Uses Claude Opus for high-accuracy verification. Use this to systematically check different areas for missed taxiways.",
@@ -369,7 +523,7 @@ At the end, provide:
         "properties": {
             "image_path": {
                 "type": "string",
-                "description": "Path to the PNG airport diagram file"
+                "description": "Path to the PNG airport diagram file, or an http(s) URL"
             },
             "region": {
                 "type": "string",
@@ -392,20 +546,15 @@ async def scan_diagram_region(args: dict[str, Any]) -> dict[str, Any]:
     known_taxiways = args.get("known_taxiways", [])
 
     try:
-        path = Path(image_path)
-        if not path.exists():
+        if not is_image_url(image_path) and not Path(image_path).exists():
             return {
                 "content": [{"type": "text", "text": f"Error: Image file not found: {image_path}"}],
                 "is_error": True
             }
 
-        suffix = path.suffix.lower()
-        media_type = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}.get(
-            suffix, "image/png"
-        )
-
-        with open(path, "rb") as f:
-            image_data = base64.standard_b64encode(f.read()).decode("utf-8")
+        # Upload only the requested region (URLs are sent uncropped)
+        cropped = not is_image_url(image_path)
+        source = await asyncio.to_thread(get_image_source, image_path, REGION_BOXES[region])
 
         known_list = ", ".join(sorted(known_taxiways)) if known_taxiways else "none"
 
@@ -421,13 +570,18 @@ async def scan_diagram_region(args: dict[str, Any]) -> dict[str, Any]:
             "bottom-edge": "along the BOTTOM EDGE",
         }
 
+        if cropped:
+            focus = f"This image is cropped to {region_descriptions[region]} of the diagram"
+        else:
+            focus = f"Focus ONLY on {region_descriptions[region]} of this diagram"
+
         scan_prompt = f"""## Region Scan Task
 
 Focus Area: **{region_descriptions[region]}**
 Already known taxiways: {known_list}
 
 ### Instructions:
-1. Focus ONLY on {region_descriptions[region]} of this diagram
+1. {focus}
 2. Look for ANY grey taxiway paths in this region
 3. For each taxiway path found, note its letter/name
 4. Specifically look for taxiway letters that are NOT in the known list
@@ -444,26 +598,10 @@ Already known taxiways: {known_list}
 3. **NEW taxiways found**: [any not in known list, or "none"]"""
 
         # Call Opus for high-accuracy region scanning
-        client = Anthropic()
-        response = client.messages.create(
+        response = await get_client().messages.create(
             model=VERIFICATION_MODEL,
             max_tokens=1500,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": image_data,
-                            },
-                        },
-                        {"type": "text", "text": scan_prompt},
-                    ],
-                }
-            ],
+            messages=_image_messages(source, scan_prompt, cache=not cropped),
         )
 
         result_text = response.content[0].text
@@ -486,5 +624,6 @@ ANALYSIS_TOOLS = [
     load_diagram_image,
     report_analysis_progress,
     trace_paths_from_point,
+    trace_paths_from_points,
     scan_diagram_region,
 ]
@@ -3,22 +3,27 @@
 These tools allow the agent to create nodes and connections in the Neo4j database.
 """
 
+from collections.abc import Iterator
+from dataclasses import replace
+from itertools import islice
 from typing import Any
 
 from claude_agent_sdk import tool
+from neo4j.exceptions import ConstraintError
 
 from airport_graph_agent.db import (
-    create_connection as db_create_connection,
+    create_connections_batch as db_create_connections_batch,
     create_node as db_create_node,
-    get_all_connections,
-    get_all_nodes,
-    get_graph_stats,
+    create_node_rows as db_create_node_rows,
+    group_nodes_by_type,
+    read_graph,
 )
 from airport_graph_agent.schema import (
     Connection,
     Direction,
     FBO,
     HoldShort,
+    Node,
     NodeType,
     Ramp,
     RunwayEnd,
@@ -27,119 +32,149 @@ from airport_graph_agent.schema import (
 )
 
 
+# Number of connections listed by get_current_graph
+MAX_LISTED_CONNECTIONS = 20
+
+# Formats one node of the get_current_graph listing
+_format_node_line = "  - {name} (id: {id}, pos: {x:.0f},{y:.0f})".format_map
+
+# Node classes, labels and required type-specific fields, keyed by tool node_type
+_NODE_CLASSES: dict[str, tuple[type[Node], NodeType, tuple[str, ...]]] = {
+    "runway_end": (RunwayEnd, NodeType.RUNWAY_END, ("heading", "runway_id")),
+    "taxiway_intersection": (
+        TaxiwayIntersection, NodeType.TAXIWAY_INTERSECTION, ("taxiways",)
+    ),
+    "hold_short": (HoldShort, NodeType.HOLD_SHORT, ("runway", "taxiway")),
+    "fbo": (FBO, NodeType.FBO, ()),
+    "terminal": (Terminal, NodeType.TERMINAL, ()),
+    "ramp": (Ramp, NodeType.RAMP, ()),
+}
+
+# Properties shared by every node
+_BASE_NODE_FIELDS = ("id", "airport", "name", "x", "y")
+
+# Input properties describing a single node, shared by create_node and create_nodes
+_NODE_PROPERTIES = {
+    "node_type": {
+        "type": "string",
+        "enum": ["runway_end", "taxiway_intersection", "hold_short", "fbo", "terminal", "ramp"],
+        "description": "The type of node to create"
+    },
+    "airport": {
+        "type": "string",
+        "description": "ICAO airport code (e.g., KDPA)"
+    },
+    "id": {
+        "type": "string",
+        "description": "Unique identifier for the node (e.g., KDPA_rwy_27L)"
+    },
+    "name": {
+        "type": "string",
+        "description": "Display name (e.g., 27L, Atlantic Aviation)"
+    },
+    "x": {
+        "type": "number",
+        "description": "Relative X position on diagram (0-100)"
+    },
+    "y": {
+        "type": "number",
+        "description": "Relative Y position on diagram (0-100)"
+    },
+    "heading": {
+        "type": "integer",
+        "description": "Magnetic heading (required for runway_end, e.g., 270 for runway 27)"
+    },
+    "runway_id": {
+        "type": "string",
+        "description": "Runway identifier grouping both ends (required for runway_end, e.g., 9_27)"
+    },
+    "taxiways": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "List of taxiway names at this intersection (required for taxiway_intersection)"
+    },
+    "runway": {
+        "type": "string",
+        "description": "Runway to hold short of (required for hold_short)"
+    },
+    "taxiway": {
+        "type": "string",
+        "description": "Taxiway this hold short is on (required for hold_short)"
+    }
+}
+
+_NODE_REQUIRED = ["node_type", "airport", "id", "name", "x", "y"]
+
+
+def _lookup_node_type(spec: dict[str, Any]) -> tuple[type[Node], NodeType, tuple[str, ...]]:
+    """Look up and check the node type of tool input.
+
+    Raises:
+        ValueError: If the node type is unknown or a required field is missing.
+    """
+    node_type = spec["node_type"]
+    if node_type not in _NODE_CLASSES:
+        raise ValueError(f"Unknown node type '{node_type}'")
+
+    node_class, label, fields = _NODE_CLASSES[node_type]
+    if any(field not in spec for field in fields):
+        required = " and ".join(f"'{field}'" for field in fields)
+        raise ValueError(f"{node_type} requires {required}")
+    return node_class, label, fields
+
+
+def _build_node(spec: dict[str, Any]) -> Node:
+    """Build a Node from tool input.
+
+    Raises:
+        ValueError: If the node type is unknown or a required field is missing.
+    """
+    node_class, _, fields = _lookup_node_type(spec)
+    return node_class(
+        id=spec["id"], airport=spec["airport"], name=spec["name"], x=spec["x"], y=spec["y"],
+        **{field: spec[field] for field in fields},
+    )
+
+
+def _build_node_row(spec: dict[str, Any]) -> tuple[NodeType, dict[str, Any]]:
+    """Build a node's label and Cypher parameter row straight from tool input.
+
+    Used by create_nodes so a batch skips constructing and then flattening
+    a Node object per entry.
+
+    Raises:
+        KeyError: If a base node field is missing.
+        ValueError: If the node type is unknown or a required field is missing.
+    """
+    _, label, fields = _lookup_node_type(spec)
+    return label, {field: spec[field] for field in _BASE_NODE_FIELDS + fields}
+
+
 @tool(
     "create_node",
     "Create a node in the airport graph. Use this to add runways, taxiways, FBOs, terminals, ramps, or hold short positions.",
     {
         "type": "object",
-        "properties": {
-            "node_type": {
-                "type": "string",
-                "enum": ["runway_end", "taxiway_intersection", "hold_short", "fbo", "terminal", "ramp"],
-                "description": "The type of node to create"
-            },
-            "airport": {
-                "type": "string",
-                "description": "ICAO airport code (e.g., KDPA)"
-            },
-            "id": {
-                "type": "string",
-                "description": "Unique identifier for the node (e.g., KDPA_rwy_27L)"
-            },
-            "name": {
-                "type": "string",
-                "description": "Display name (e.g., 27L, Atlantic Aviation)"
-            },
-            "x": {
-                "type": "number",
-                "description": "Relative X position on diagram (0-100)"
-            },
-            "y": {
-                "type": "number",
-                "description": "Relative Y position on diagram (0-100)"
-            },
-            "heading": {
-                "type": "integer",
-                "description": "Magnetic heading (required for runway_end, e.g., 270 for runway 27)"
-            },
-            "runway_id": {
-                "type": "string",
-                "description": "Runway identifier grouping both ends (required for runway_end, e.g., 9_27)"
-            },
-            "taxiways": {
-                "type": "array",
-                "items": {"type": "string"},
-                "description": "List of taxiway names at this intersection (required for taxiway_intersection)"
-            },
-            "runway": {
-                "type": "string",
-                "description": "Runway to hold short of (required for hold_short)"
-            },
-            "taxiway": {
-                "type": "string",
-                "description": "Taxiway this hold short is on (required for hold_short)"
-            }
-        },
-        "required": ["node_type", "airport", "id", "name", "x", "y"]
+        "properties": _NODE_PROPERTIES,
+        "required": _NODE_REQUIRED
     }
 )
 async def create_node(args: dict[str, Any]) -> dict[str, Any]:
     """Create a node in the airport graph."""
-    node_type = args["node_type"]
-    airport = args["airport"]
-    node_id = args["id"]
-    name = args["name"]
-    x = args["x"]
-    y = args["y"]
-
     try:
-        if node_type == "runway_end":
-            if "heading" not in args or "runway_id" not in args:
-                return {
-                    "content": [{"type": "text", "text": "Error: runway_end requires 'heading' and 'runway_id'"}],
-                    "is_error": True
-                }
-            node = RunwayEnd(
-                id=node_id, airport=airport, name=name, x=x, y=y,
-                heading=args["heading"], runway_id=args["runway_id"]
-            )
-        elif node_type == "taxiway_intersection":
-            if "taxiways" not in args:
-                return {
-                    "content": [{"type": "text", "text": "Error: taxiway_intersection requires 'taxiways' array"}],
-                    "is_error": True
-                }
-            node = TaxiwayIntersection(
-                id=node_id, airport=airport, name=name, x=x, y=y,
-                taxiways=args["taxiways"]
-            )
-        elif node_type == "hold_short":
-            if "runway" not in args or "taxiway" not in args:
-                return {
-                    "content": [{"type": "text", "text": "Error: hold_short requires 'runway' and 'taxiway'"}],
-                    "is_error": True
-                }
-            node = HoldShort(
-                id=node_id, airport=airport, name=name, x=x, y=y,
-                runway=args["runway"], taxiway=args["taxiway"]
-            )
-        elif node_type == "fbo":
-            node = FBO(id=node_id, airport=airport, name=name, x=x, y=y)
-        elif node_type == "terminal":
-            node = Terminal(id=node_id, airport=airport, name=name, x=x, y=y)
-        elif node_type == "ramp":
-            node = Ramp(id=node_id, airport=airport, name=name, x=x, y=y)
-        else:
-            return {
-                "content": [{"type": "text", "text": f"Error: Unknown node type '{node_type}'"}],
-                "is_error": True
-            }
+        node = _build_node(args)
+    except ValueError as e:
+        return {
+            "content": [{"type": "text", "text": f"Error: {e}"}],
+            "is_error": True
+        }
 
-        result = db_create_node(node)
+    try:
+        db_create_node(node)
         return {
             "content": [{
                 "type": "text",
-                "text": f"Created {node_type} node: {name} (id: {node_id})"
+                "text": f"Created {args['node_type']} node: {node.name} (id: {node.id})"
             }]
         }
     except Exception as e:
@@ -150,46 +185,161 @@ async def create_node(args: dict[str, Any]) -> dict[str, Any]:
 
 
 @tool(
-    "create_connection",
-    "Create a connection between two nodes in the airport graph. Use this to link taxiways, runways, ramps, etc.",
+    "create_nodes",
+    "Create many nodes in the airport graph in a single write. Prefer this over repeated create_node calls when adding a batch of runway ends, intersections, hold shorts, etc. Entries with missing or invalid fields, or an id repeated within the batch, are skipped; if any id already exists in the graph the whole batch is rejected and nothing is written, so resend it without those nodes.",
     {
         "type": "object",
         "properties": {
-            "from_id": {
-                "type": "string",
-                "description": "ID of the source node"
-            },
-            "to_id": {
-                "type": "string",
-                "description": "ID of the destination node"
-            },
-            "via": {
-                "type": "string",
-                "description": "Surface name connecting them (taxiway name like 'A', or 'runway', 'ramp')"
-            },
-            "distance": {
-                "type": "integer",
-                "description": "Relative distance (1-10 scale)",
-                "minimum": 1,
-                "maximum": 10
-            },
-            "direction": {
-                "type": "string",
-                "enum": ["N", "NE", "E", "SE", "S", "SW", "W", "NW"],
-                "description": "Cardinal direction of travel from source to destination"
-            },
-            "requires_hold": {
-                "type": "boolean",
-                "description": "True if this connection crosses a runway (requires hold short)",
-                "default": False
-            },
-            "bidirectional": {
-                "type": "boolean",
-                "description": "If true, create connection in both directions",
-                "default": True
+            "nodes": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": _NODE_PROPERTIES,
+                    "required": _NODE_REQUIRED
+                },
+                "description": "Nodes to create, each with the same fields as create_node"
             }
         },
-        "required": ["from_id", "to_id", "via", "distance", "direction"]
+        "required": ["nodes"]
+    }
+)
+async def create_nodes(args: dict[str, Any]) -> dict[str, Any]:
+    """Create many nodes in the airport graph with one database write."""
+    rows_by_type: dict[NodeType, list[dict]] = {}
+    errors = []
+    seen_ids: set[str] = set()
+    for spec in args["nodes"]:
+        try:
+            label, row = _build_node_row(spec)
+            if row["id"] in seen_ids:
+                raise ValueError("duplicate id in this batch")
+            seen_ids.add(row["id"])
+            rows_by_type.setdefault(label, []).append(row)
+        except KeyError as e:
+            errors.append(f"  - {spec.get('id', '?')}: missing {e}")
+        except ValueError as e:
+            errors.append(f"  - {spec.get('id', '?')}: {e}")
+
+    try:
+        created = db_create_node_rows(rows_by_type) if rows_by_type else []
+    except ConstraintError as e:
+        return {
+            "content": [{
+                "type": "text",
+                "text": (
+                    "Batch rejected, no nodes were written: a node id already exists "
+                    f"({e}). Resend the batch without the existing nodes."
+                ),
+            }],
+            "is_error": True
+        }
+    except Exception as e:
+        return {
+            "content": [{"type": "text", "text": f"Error creating nodes: {str(e)}"}],
+            "is_error": True
+        }
+
+    lines = [f"Created {len(created)} nodes:"]
+    lines.extend(
+        f"  - {label.value}: {row['name']} (id: {row['id']})"
+        for label, rows in rows_by_type.items()
+        for row in rows
+    )
+    if errors:
+        lines.append(f"Skipped {len(errors)} invalid nodes:")
+        lines.extend(errors)
+
+    result: dict[str, Any] = {"content": [{"type": "text", "text": "\n".join(lines)}]}
+    if errors and not created:
+        result["is_error"] = True
+    return result
+
+
+# Direction of travel for the reverse of a connection
+_OPPOSITE_DIRECTIONS = {
+    Direction.N: Direction.S,
+    Direction.NE: Direction.SW,
+    Direction.E: Direction.W,
+    Direction.SE: Direction.NW,
+    Direction.S: Direction.N,
+    Direction.SW: Direction.NE,
+    Direction.W: Direction.E,
+    Direction.NW: Direction.SE,
+}
+
+# Input properties describing a single connection, shared by create_connection
+# and create_connections
+_CONNECTION_PROPERTIES = {
+    "from_id": {
+        "type": "string",
+        "description": "ID of the source node"
+    },
+    "to_id": {
+        "type": "string",
+        "description": "ID of the destination node"
+    },
+    "via": {
+        "type": "string",
+        "description": "Surface name connecting them (taxiway name like 'A', or 'runway', 'ramp')"
+    },
+    "distance": {
+        "type": "integer",
+        "description": "Relative distance (1-10 scale)",
+        "minimum": 1,
+        "maximum": 10
+    },
+    "direction": {
+        "type": "string",
+        "enum": ["N", "NE", "E", "SE", "S", "SW", "W", "NW"],
+        "description": "Cardinal direction of travel from source to destination"
+    },
+    "requires_hold": {
+        "type": "boolean",
+        "description": "True if this connection crosses a runway (requires hold short)",
+        "default": False
+    },
+    "bidirectional": {
+        "type": "boolean",
+        "description": "If true, create connection in both directions",
+        "default": True
+    }
+}
+
+_CONNECTION_REQUIRED = ["from_id", "to_id", "via", "distance", "direction"]
+
+
+def _build_connections(spec: dict[str, Any]) -> list[Connection]:
+    """Build the Connection for tool input, plus its reverse if bidirectional."""
+    conn = Connection(
+        from_id=spec["from_id"],
+        to_id=spec["to_id"],
+        via=spec["via"],
+        distance=spec["distance"],
+        direction=Direction[spec["direction"]],
+        requires_hold=spec.get("requires_hold", False)
+    )
+
+    connections = [conn]
+    if spec.get("bidirectional", True):
+        # The reverse differs only in its endpoints and direction
+        connections.append(
+            replace(
+                conn,
+                from_id=conn.to_id,
+                to_id=conn.from_id,
+                direction=_OPPOSITE_DIRECTIONS[conn.direction],
+            )
+        )
+    return connections
+
+
+@tool(
+    "create_connection",
+    "Create a connection between two nodes in the airport graph. Use this to link taxiways, runways, ramps, etc.",
+    {
+        "type": "object",
+        "properties": _CONNECTION_PROPERTIES,
+        "required": _CONNECTION_REQUIRED
     }
 )
 async def create_connection(args: dict[str, Any]) -> dict[str, Any]:
@@ -197,50 +347,15 @@ async def create_connection(args: dict[str, Any]) -> dict[str, Any]:
     from_id = args["from_id"]
     to_id = args["to_id"]
     via = args["via"]
-    distance = args["distance"]
-    direction_str = args["direction"]
-    requires_hold = args.get("requires_hold", False)
-    bidirectional = args.get("bidirectional", True)
 
     try:
-        direction = Direction[direction_str]
-
-        # Create forward connection
-        conn = Connection(
-            from_id=from_id,
-            to_id=to_id,
-            via=via,
-            distance=distance,
-            direction=direction,
-            requires_hold=requires_hold
-        )
-        db_create_connection(conn)
+        # Both directions are written in the same transaction
+        connections = _build_connections(args)
+        db_create_connections_batch(connections)
 
         result_text = f"Created connection: {from_id} -> {to_id} via {via}"
-
-        # Create reverse connection if bidirectional
-        if bidirectional:
-            # Calculate opposite direction
-            opposite_directions = {
-                Direction.N: Direction.S,
-                Direction.NE: Direction.SW,
-                Direction.E: Direction.W,
-                Direction.SE: Direction.NW,
-                Direction.S: Direction.N,
-                Direction.SW: Direction.NE,
-                Direction.W: Direction.E,
-                Direction.NW: Direction.SE,
-            }
-            reverse_conn = Connection(
-                from_id=to_id,
-                to_id=from_id,
-                via=via,
-                distance=distance,
-                direction=opposite_directions[direction],
-                requires_hold=requires_hold
-            )
-            db_create_connection(reverse_conn)
-            result_text += f" (bidirectional)"
+        if len(connections) > 1:
+            result_text += " (bidirectional)"
 
         return {
             "content": [{"type": "text", "text": result_text}]
@@ -252,6 +367,69 @@ async def create_connection(args: dict[str, Any]) -> dict[str, Any]:
         }
 
 
+@tool(
+    "create_connections",
+    "Create many connections in the airport graph in a single write. Prefer this over repeated create_connection calls when linking a batch of nodes.",
+    {
+        "type": "object",
+        "properties": {
+            "connections": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": _CONNECTION_PROPERTIES,
+                    "required": _CONNECTION_REQUIRED
+                },
+                "description": "Connections to create, each with the same fields as create_connection"
+            }
+        },
+        "required": ["connections"]
+    }
+)
+async def create_connections(args: dict[str, Any]) -> dict[str, Any]:
+    """Create many connections, in both directions where requested, with one write."""
+    try:
+        connections = [
+            conn for spec in args["connections"] for conn in _build_connections(spec)
+        ]
+        created = db_create_connections_batch(connections)
+    except Exception as e:
+        return {
+            "content": [{"type": "text", "text": f"Error creating connections: {str(e)}"}],
+            "is_error": True
+        }
+
+    result_text = f"Created {created} of {len(connections)} directed connections"
+    if created < len(connections):
+        result_text += " (connections whose endpoints don't exist were skipped)"
+
+    return {
+        "content": [{"type": "text", "text": result_text}]
+    }
+
+
+def _graph_lines(
+    airport: str, nodes: list[dict], connections: list[dict], stats: dict
+) -> Iterator[str]:
+    """Yield the lines of the get_current_graph summary."""
+    yield f"Graph for {airport}:"
+    yield f"Total: {stats['total_nodes']} nodes, {stats['total_connections']} connections"
+    yield ""
+
+    for node_type, group in group_nodes_by_type(nodes).items():
+        yield f"{node_type}s:"
+        yield from map(_format_node_line, group)
+        yield ""
+
+    if connections:
+        yield "Connections:"
+        for conn in islice(connections, MAX_LISTED_CONNECTIONS):
+            hold_marker = " [HOLD]" if conn["requires_hold"] else ""
+            yield f"  - {conn['from_id']} -> {conn['to_id']} via {conn['via']}{hold_marker}"
+        if len(connections) > MAX_LISTED_CONNECTIONS:
+            yield f"  ... and {len(connections) - MAX_LISTED_CONNECTIONS} more"
+
+
 @tool(
     "get_current_graph",
     "Get the current state of the graph for an airport. Use this to see what nodes and connections exist.",
@@ -271,39 +449,13 @@ async def get_current_graph(args: dict[str, Any]) -> dict[str, Any]:
     airport = args["airport"]
 
     try:
-        nodes = get_all_nodes(airport)
-        connections = get_all_connections(airport)
-        stats = get_graph_stats(airport)
-
-        # Format nodes by type
-        nodes_by_type: dict[str, list] = {}
-        for node in nodes:
-            node_type = node["type"]
-            if node_type not in nodes_by_type:
-                nodes_by_type[node_type] = []
-            nodes_by_type[node_type].append(f"{node['name']} (id: {node['id']}, pos: {node['x']:.0f},{node['y']:.0f})")
-
-        # Format output
-        lines = [f"Graph for {airport}:"]
-        lines.append(f"Total: {stats['total_nodes']} nodes, {stats['total_connections']} connections")
-        lines.append("")
-
-        for node_type, node_list in nodes_by_type.items():
-            lines.append(f"{node_type}s:")
-            for n in node_list:
-                lines.append(f"  - {n}")
-            lines.append("")
-
-        if connections:
-            lines.append("Connections:")
-            for conn in connections[:20]:  # Limit to first 20
-                hold_marker = " [HOLD]" if conn["requires_hold"] else ""
-                lines.append(f"  - {conn['from_id']} -> {conn['to_id']} via {conn['via']}{hold_marker}")
-            if len(connections) > 20:
-                lines.append(f"  ... and {len(connections) - 20} more")
+        nodes, connections, stats = await read_graph(airport)
 
         return {
-            "content": [{"type": "text", "text": "\n".join(lines)}]
+            "content": [{
+                "type": "text",
+                "text": "\n".join(_graph_lines(airport, nodes, connections, stats))
+            }]
         }
     except Exception as e:
         return {
@@ -313,4 +465,10 @@ async def get_current_graph(args: dict[str, Any]) -> dict[str, Any]:
 
 
 # Export all tools
-GRAPH_TOOLS = [create_node, create_connection, get_current_graph]
+GRAPH_TOOLS = [
+    create_node,
+    create_nodes,
+    create_connection,
+    create_connections,
+    get_current_graph,
+]
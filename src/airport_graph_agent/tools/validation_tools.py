@@ -3,13 +3,36 @@
 These tools help validate the extracted graph for completeness and accuracy.
 """
 
-import base64
+import asyncio
+import io
 from pathlib import Path
 from typing import Any
 
 from claude_agent_sdk import tool
 
-from airport_graph_agent.db import get_all_connections, get_all_nodes, get_graph_stats
+from airport_graph_agent.db import (
+    get_all_nodes,
+    get_graph_stats,
+    get_validation_findings,
+    group_nodes_by_type,
+)
+from airport_graph_agent.images import get_image_content, is_image_url
+
+# Formats one node of the validate_against_diagram element list
+_format_node_position = "  - {name} at ({x:.0f}, {y:.0f})\n".format_map
+
+# Checklist closing the validate_against_diagram summary
+VALIDATION_CHECKLIST = """
+### Validation Checklist:
+Please verify the following by comparing with the diagram:
+- [ ] All runways are captured with both ends
+- [ ] All major taxiways are included
+- [ ] Taxiway intersections are at correct positions
+- [ ] Hold short positions are before each runway crossing
+- [ ] FBOs and ramps are in correct locations
+- [ ] Connections accurately represent the taxiway layout
+
+Report any discrepancies found."""
 
 
 @tool(
@@ -31,69 +54,43 @@ async def validate_graph_structure(args: dict[str, Any]) -> dict[str, Any]:
     airport = args["airport"]
 
     try:
-        nodes = get_all_nodes(airport)
-        connections = get_all_connections(airport)
-        stats = get_graph_stats(airport)
+        findings, stats = await asyncio.gather(
+            asyncio.to_thread(get_validation_findings, airport),
+            asyncio.to_thread(get_graph_stats, airport),
+        )
 
         issues: list[str] = []
         warnings: list[str] = []
 
-        # Build adjacency info
-        connected_nodes: set[str] = set()
-        for conn in connections:
-            connected_nodes.add(conn["from_id"])
-            connected_nodes.add(conn["to_id"])
-
-        node_ids = {n["id"] for n in nodes}
-        node_types = {n["id"]: n["type"] for n in nodes}
-
         # Check 1: Orphan nodes (no connections)
-        orphan_nodes = node_ids - connected_nodes
-        for orphan in orphan_nodes:
-            node_type = node_types.get(orphan, "Unknown")
-            issues.append(f"Orphan node (no connections): {orphan} ({node_type})")
+        for f in findings:
+            if f["degree"] == 0:
+                issues.append(f"Orphan node (no connections): {f['id']} ({f['type']})")
 
         # Check 2: Runway ends should come in pairs
-        runway_ends = [n for n in nodes if n["type"] == "RunwayEnd"]
-        runway_ids: dict[str, list] = {}
-        for rwy in runway_ends:
-            # Extract runway_id from the node - we need to query it
-            # For now, just check we have an even number
-            pass
-        if len(runway_ends) % 2 != 0:
-            warnings.append(f"Odd number of runway ends ({len(runway_ends)}). Runways should have 2 ends each.")
+        runway_end_count = stats["nodes_by_type"].get("RunwayEnd", 0)
+        if runway_end_count % 2 != 0:
+            warnings.append(f"Odd number of runway ends ({runway_end_count}). Runways should have 2 ends each.")
 
         # Check 3: Hold short nodes should connect to runway ends
-        hold_shorts = [n for n in nodes if n["type"] == "HoldShort"]
-        for hs in hold_shorts:
-            hs_connections = [c for c in connections if c["from_id"] == hs["id"] or c["to_id"] == hs["id"]]
-            connects_to_runway = any(
-                node_types.get(c["to_id"]) == "RunwayEnd" or node_types.get(c["from_id"]) == "RunwayEnd"
-                for c in hs_connections
-            )
-            if not connects_to_runway:
-                warnings.append(f"Hold short {hs['name']} doesn't connect to any runway end")
+        for f in findings:
+            if f["type"] == "HoldShort" and not f["touches_runway"]:
+                warnings.append(f"Hold short {f['name']} doesn't connect to any runway end")
 
         # Check 4: Every taxiway intersection should have at least 2 connections
-        taxiway_intersections = [n for n in nodes if n["type"] == "TaxiwayIntersection"]
-        for twy in taxiway_intersections:
-            twy_connections = [c for c in connections if c["from_id"] == twy["id"] or c["to_id"] == twy["id"]]
-            if len(twy_connections) < 2:
-                warnings.append(f"Taxiway intersection {twy['name']} has only {len(twy_connections)} connection(s)")
+        for f in findings:
+            if f["type"] == "TaxiwayIntersection" and f["degree"] < 2:
+                warnings.append(f"Taxiway intersection {f['name']} has only {f['degree']} connection(s)")
 
         # Check 5: FBOs and ramps should be connected
-        fbos_and_ramps = [n for n in nodes if n["type"] in ["FBO", "Ramp"]]
-        for loc in fbos_and_ramps:
-            loc_connections = [c for c in connections if c["from_id"] == loc["id"] or c["to_id"] == loc["id"]]
-            if len(loc_connections) == 0:
-                issues.append(f"{loc['type']} {loc['name']} has no connections")
-
-        # Check 6: Connections referencing non-existent nodes
-        for conn in connections:
-            if conn["from_id"] not in node_ids:
-                issues.append(f"Connection references non-existent node: {conn['from_id']}")
-            if conn["to_id"] not in node_ids:
-                issues.append(f"Connection references non-existent node: {conn['to_id']}")
+        for f in findings:
+            if f["type"] in ("FBO", "Ramp") and f["degree"] == 0:
+                issues.append(f"{f['type']} {f['name']} has no connections")
+
+        # Check 6: Connections referencing nodes outside this airport
+        missing_ids = {node_id for f in findings for node_id in f["foreign_ids"]}
+        for missing in sorted(missing_ids):
+            issues.append(f"Connection references non-existent node: {missing}")
 
         # Check 7: Minimum graph size
         if stats["total_nodes"] < 5:
@@ -145,7 +142,7 @@ async def validate_graph_structure(args: dict[str, Any]) -> dict[str, Any]:
             },
             "image_path": {
                 "type": "string",
-                "description": "Path to the original PNG airport diagram"
+                "description": "Path to the original PNG airport diagram, or an http(s) URL"
             }
         },
         "required": ["airport", "image_path"]
@@ -158,78 +155,41 @@ async def validate_against_diagram(args: dict[str, Any]) -> dict[str, Any]:
 
     try:
         # Load the image
-        path = Path(image_path)
-        if not path.exists():
+        if not is_image_url(image_path) and not Path(image_path).exists():
             return {
                 "content": [{"type": "text", "text": f"Error: Image file not found: {image_path}"}],
                 "is_error": True
             }
 
-        # Determine media type
-        suffix = path.suffix.lower()
-        media_types = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
-        media_type = media_types.get(suffix, "image/png")
-
-        with open(path, "rb") as f:
-            image_data = base64.standard_b64encode(f.read()).decode("utf-8")
-
-        # Get current graph state
-        nodes = get_all_nodes(airport)
-        connections = get_all_connections(airport)
-        stats = get_graph_stats(airport)
+        # Prepare the image (cached across tool calls) and read the current
+        # graph state concurrently
+        image, nodes, stats = await asyncio.gather(
+            asyncio.to_thread(get_image_content, image_path),
+            asyncio.to_thread(get_all_nodes, airport),
+            asyncio.to_thread(get_graph_stats, airport),
+        )
 
-        # Format nodes by type
-        nodes_by_type: dict[str, list] = {}
-        for node in nodes:
-            node_type = node["type"]
-            if node_type not in nodes_by_type:
-                nodes_by_type[node_type] = []
-            nodes_by_type[node_type].append(node)
+        nodes_by_type = group_nodes_by_type(nodes)
 
         # Build summary
-        summary_lines = [
-            f"## Visual Validation for {airport}",
-            "",
-            "Compare the diagram below with the extracted graph:",
-            "",
-            f"**Graph Statistics:** {stats['total_nodes']} nodes, {stats['total_connections']} connections",
-            "",
-            "### Extracted Elements:",
-        ]
-
+        summary = io.StringIO()
+        summary.write(
+            f"## Visual Validation for {airport}\n\n"
+            "Compare the diagram below with the extracted graph:\n\n"
+            f"**Graph Statistics:** {stats['total_nodes']} nodes, {stats['total_connections']} connections\n\n"
+            "### Extracted Elements:\n"
+        )
         for node_type, type_nodes in nodes_by_type.items():
-            summary_lines.append(f"\n**{node_type}s ({len(type_nodes)}):**")
-            for n in type_nodes:
-                pos = f"({n['x']:.0f}, {n['y']:.0f})"
-                summary_lines.append(f"  - {n['name']} at {pos}")
-
-        summary_lines.extend([
-            "",
-            "### Validation Checklist:",
-            "Please verify the following by comparing with the diagram:",
-            "- [ ] All runways are captured with both ends",
-            "- [ ] All major taxiways are included",
-            "- [ ] Taxiway intersections are at correct positions",
-            "- [ ] Hold short positions are before each runway crossing",
-            "- [ ] FBOs and ramps are in correct locations",
-            "- [ ] Connections accurately represent the taxiway layout",
-            "",
-            "Report any discrepancies found.",
-        ])
+            summary.write(f"\n**{node_type}s ({len(type_nodes)}):**\n")
+            summary.writelines(map(_format_node_position, type_nodes))
+        summary.write(VALIDATION_CHECKLIST)
 
         return {
             "content": [
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": media_type,
-                        "data": image_data,
-                    }
-                },
+                image,
                 {
                     "type": "text",
-                    "text": "\n".join(summary_lines)
+                    "text": summary.getvalue()
                 }
             ]
         }
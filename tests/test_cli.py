@@ -0,0 +1,44 @@
+"""Tests for argument checks in the airport-graph CLI."""
+
+import pytest
+from click.testing import CliRunner
+
+from airport_graph_agent import cli
+
+
+@pytest.fixture(autouse=True)
+def no_agent(monkeypatch):
+    """Fail if a command gets as far as running the agent."""
+
+    def fail():
+        raise AssertionError("agent should not run")
+
+    monkeypatch.setattr(cli, "_agent", fail)
+
+
+def test_process_batch_rejects_duplicate_airports(tmp_path):
+    first = tmp_path / "a" / "KAAA.png"
+    second = tmp_path / "b" / "kaaa.png"
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(b"")
+
+    result = CliRunner().invoke(cli.main, ["process-batch", str(first), str(second)])
+    assert result.exit_code == 2
+    assert "both map to airport KAAA" in result.output
+
+
+@pytest.mark.parametrize("concurrency", ["0", "-1"])
+def test_process_batch_rejects_concurrency_below_one(tmp_path, concurrency):
+    diagram = tmp_path / "KAAA.png"
+    diagram.write_bytes(b"")
+
+    result = CliRunner().invoke(cli.main, ["process-batch", "-j", concurrency, str(diagram)])
+    assert result.exit_code == 2
+    assert "--concurrency" in result.output
+
+
+def test_process_rejects_missing_local_diagram(tmp_path):
+    result = CliRunner().invoke(cli.main, ["process", str(tmp_path / "missing.png"), "-a", "KAAA"])
+    assert result.exit_code == 2
+    assert "does not exist" in result.output
@@ -0,0 +1,48 @@
+"""Tests for the pure-Python helpers in airport_graph_agent.db."""
+
+from airport_graph_agent.db import _parse_schema_statements, group_nodes_by_type
+from airport_graph_agent.schema import SCHEMA_CONSTRAINTS
+
+
+def test_parse_schema_statements_keeps_statement_after_leading_comment():
+    statements = _parse_schema_statements(SCHEMA_CONSTRAINTS)
+    assert "runway_end_id" in statements
+    assert statements["runway_end_id"].startswith("CREATE CONSTRAINT runway_end_id")
+    assert not any(statement.startswith("//") for statement in statements.values())
+
+
+def test_parse_schema_statements_covers_every_statement():
+    statements = _parse_schema_statements(SCHEMA_CONSTRAINTS)
+    expected = SCHEMA_CONSTRAINTS.count("CREATE CONSTRAINT") + SCHEMA_CONSTRAINTS.count(
+        "CREATE INDEX"
+    )
+    assert len(statements) == expected
+
+
+def test_parse_schema_statements_keys_by_name():
+    script = """
+    // comment
+    CREATE CONSTRAINT a_id IF NOT EXISTS
+    FOR (n:A) REQUIRE n.id IS UNIQUE;
+
+    CREATE INDEX a_airport IF NOT EXISTS
+    FOR (n:A) ON (n.airport);
+    """
+    assert list(_parse_schema_statements(script)) == ["a_id", "a_airport"]
+
+
+def test_group_nodes_by_type_across_airports():
+    # get_all_nodes orders by airport first, so types repeat in separate runs
+    nodes = [
+        {"airport": "KAAA", "type": "FBO", "name": "A1"},
+        {"airport": "KAAA", "type": "RunwayEnd", "name": "09"},
+        {"airport": "KBBB", "type": "FBO", "name": "B1"},
+        {"airport": "KBBB", "type": "RunwayEnd", "name": "27"},
+    ]
+    grouped = group_nodes_by_type(nodes)
+    assert [n["name"] for n in grouped["FBO"]] == ["A1", "B1"]
+    assert [n["name"] for n in grouped["RunwayEnd"]] == ["09", "27"]
+
+
+def test_group_nodes_by_type_empty():
+    assert group_nodes_by_type([]) == {}
@@ -0,0 +1,33 @@
+"""Tests for node input validation in airport_graph_agent.tools.graph_tools."""
+
+import pytest
+
+from airport_graph_agent.schema import NodeType
+from airport_graph_agent.tools.graph_tools import _build_node_row
+
+BASE = {"airport": "KAAA", "id": "KAAA_rwy_27", "name": "27", "x": 10, "y": 20}
+
+
+def test_build_node_row_runway_end():
+    label, row = _build_node_row(
+        {**BASE, "node_type": "runway_end", "heading": 270, "runway_id": "9_27", "extra": 1}
+    )
+    assert label is NodeType.RUNWAY_END
+    assert row == {**BASE, "heading": 270, "runway_id": "9_27"}
+
+
+def test_build_node_row_unknown_type():
+    with pytest.raises(ValueError, match="Unknown node type"):
+        _build_node_row({**BASE, "node_type": "hangar"})
+
+
+def test_build_node_row_missing_type_field():
+    with pytest.raises(ValueError, match="hold_short requires 'runway' and 'taxiway'"):
+        _build_node_row({**BASE, "node_type": "hold_short", "runway": "27"})
+
+
+def test_build_node_row_missing_base_field():
+    spec = {**BASE, "node_type": "fbo"}
+    del spec["x"]
+    with pytest.raises(KeyError):
+        _build_node_row(spec)
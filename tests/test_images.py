@@ -0,0 +1,76 @@
+"""Tests for the encoded image cache in airport_graph_agent.images."""
+
+import os
+
+import pytest
+from PIL import Image
+
+from airport_graph_agent import images
+
+
+@pytest.fixture
+def encode_calls(monkeypatch):
+    """Empty the image cache and record calls to encode_image."""
+    monkeypatch.setattr(images, "_IMG_CACHE", {})
+    calls = []
+    encode_image = images.encode_image
+
+    def recording_encode_image(path, **kwargs):
+        calls.append((path, kwargs.get("crop_box")))
+        return encode_image(path, **kwargs)
+
+    monkeypatch.setattr(images, "encode_image", recording_encode_image)
+    return calls
+
+
+def _write_png(path, size=(40, 30)):
+    Image.new("RGB", size, "white").save(path)
+    return path
+
+
+def test_get_encoded_image_reuses_cached_result(tmp_path, encode_calls):
+    path = _write_png(tmp_path / "KAAA.png")
+    first = images.get_encoded_image(path)
+    assert images.get_encoded_image(str(path)) == first
+    assert len(encode_calls) == 1
+    assert first[1] == "image/png"
+
+
+def test_get_encoded_image_keys_by_crop_box(tmp_path, encode_calls):
+    path = _write_png(tmp_path / "KAAA.png")
+    images.get_encoded_image(path)
+    cropped = images.get_encoded_image(path, (0, 0, 50, 50))
+    images.get_encoded_image(path, (0, 0, 50, 50))
+    assert len(encode_calls) == 2
+    assert encode_calls[1][1] == (0, 0, 50, 50)
+    assert cropped[1] == "image/jpeg"
+
+
+def test_get_encoded_image_invalidates_on_change(tmp_path, encode_calls):
+    path = _write_png(tmp_path / "KAAA.png")
+    images.get_encoded_image(path)
+
+    _write_png(path, size=(60, 30))
+    images.get_encoded_image(path)
+    assert len(encode_calls) == 2
+
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    images.get_encoded_image(path)
+    assert len(encode_calls) == 3
+
+
+def test_get_encoded_image_evicts_least_recently_used(tmp_path, encode_calls, monkeypatch):
+    monkeypatch.setattr(images, "MAX_CACHED_IMAGES", 2)
+    a, b, c = (_write_png(tmp_path / f"{name}.png") for name in "abc")
+
+    images.get_encoded_image(a)
+    images.get_encoded_image(b)
+    images.get_encoded_image(a)  # a is now the most recently used
+    images.get_encoded_image(c)  # evicts b
+    assert len(images._IMG_CACHE) == 2
+
+    images.get_encoded_image(a)
+    assert len(encode_calls) == 3
+    images.get_encoded_image(b)
+    assert len(encode_calls) == 4
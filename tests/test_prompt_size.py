@@ -0,0 +1,45 @@
+"""Guard the system prompt size, which is paid in input tokens on every turn."""
+
+import os
+
+import pytest
+
+from airport_graph_agent.agent import AGENT_MODEL, get_system_prompt
+
+# Characters allowed in the system prompt; raise deliberately if it must grow
+MAX_SYSTEM_PROMPT_CHARS = 8000
+
+# Input tokens allowed for the system prompt, checked against the API when a key is set
+MAX_SYSTEM_PROMPT_TOKENS = 2500
+
+
+def test_system_prompt_within_budget():
+    prompt = get_system_prompt()
+    assert prompt
+    assert len(prompt) < MAX_SYSTEM_PROMPT_CHARS, (
+        f"System prompt is {len(prompt)} characters, budget is {MAX_SYSTEM_PROMPT_CHARS}"
+    )
+
+
+@pytest.mark.skipif(not os.getenv("ANTHROPIC_API_KEY"), reason="ANTHROPIC_API_KEY not set")
+def test_system_prompt_within_token_budget():
+    from anthropic import Anthropic
+
+    count = Anthropic().messages.count_tokens(
+        model=AGENT_MODEL,
+        system=get_system_prompt(),
+        messages=[{"role": "user", "content": "Hi"}],
+    )
+    assert count.input_tokens < MAX_SYSTEM_PROMPT_TOKENS, (
+        f"System prompt is {count.input_tokens} tokens, budget is {MAX_SYSTEM_PROMPT_TOKENS}"
+    )
+
+
+def test_system_prompt_includes_path_tracing_phase():
+    assert "trace_paths_from_point" in get_system_prompt()
+
+
+def test_system_prompt_constant_still_importable():
+    from airport_graph_agent.agent import SYSTEM_PROMPT
+
+    assert SYSTEM_PROMPT == get_system_prompt()